@@ -8,25 +8,41 @@ import sys
 import json
 import os
 import threading
+import queue
 import time
 import logging
 import io
+import re
+import mmap
+import multiprocessing
 import signal
+import contextlib
+import functools
+import itertools
+import operator
+import hashlib
+import gzip
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
-# Global flag for graceful shutdown
-STOP_REQUESTED = False
+# Let the Rust tokenizer use all cores on long documents (must be set before
+# transformers/tokenizers are imported; an explicit user setting wins)
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+# Set on SIGINT/SIGTERM for graceful shutdown; waiters wake up immediately
+STOP_EVENT = threading.Event()
 
 def signal_handler(sig, frame):
     """Handle stop signal gracefully"""
-    global STOP_REQUESTED
-    STOP_REQUESTED = True
-    print(json.dumps({"info": "Stop requested - will finish current chunk and exit gracefully"}), file=sys.stderr, flush=True)
+    STOP_EVENT.set()
+    _write_stderr(_dumpb_line({"info": "Stop requested - will finish current chunk and exit gracefully"}), sync=False)
 
 try:
     from docling.document_converter import DocumentConverter
     from docling.chunking import HybridChunker
-    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.base_models import InputFormat, DocumentStream
     import pypdf
     import psutil
 except ImportError as e:
@@ -36,31 +52,211 @@ except ImportError as e:
     }))
     sys.exit(1)
 
+try:
+    import orjson  # Optional: C-accelerated JSON for output, progress and cache files
+except ImportError:
+    orjson = None
+
+
+def _dumpb_ascii(obj):
+    """
+    Serialize to compact ASCII JSON bytes, escaping every non-ASCII character
+
+    The fallback for text that isn't valid UTF-8 (lone surrogates, e.g. from a
+    broken PDF text layer): both fast paths reject it, this writes \\udXXX escapes.
+    """
+    return json.dumps(obj, separators=(',', ':')).encode('ascii')
+
+
+def _dumpb(obj):
+    """Serialize to compact UTF-8 JSON bytes"""
+    try:
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    except (TypeError, UnicodeEncodeError):
+        return _dumpb_ascii(obj)
+
+
+def _dumpb_line(obj):
+    """Serialize to one newline-terminated JSON line (bytes), framed by the encoder"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            return _dumpb_ascii(obj) + b"\n"
+    return _dumpb(obj) + b"\n"
+
+
+def _dumps(obj):
+    """Serialize to a JSON string (for print())"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj)
+
+
+def _loads(data):
+    """Parse JSON from str or bytes"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. a \udXXX escape written by _dumpb_ascii; json accepts those
+    return json.loads(data)
+
+try:
+    import pymupdf as fitz  # Optional: much faster page counting/splitting than pypdf
+except ImportError:
+    try:
+        import fitz  # PyMuPDF < 1.24 only provides the old module name
+    except ImportError:
+        fitz = None
+
+try:
+    import pikepdf  # Optional: libqpdf page counting when PyMuPDF isn't installed
+except ImportError:
+    pikepdf = None
+
 class ProgressTracker:
-    """Thread-safe progress tracker for monitoring conversion progress"""
+    """
+    Thread-safe progress tracker for monitoring conversion progress
+
+    State is one (current_page, total_pages) tuple that is replaced in a single
+    attribute assignment, so readers always see a consistent pair without a lock.
+    """
     def __init__(self):
-        self.current_page = 0
-        self.total_pages = 0
-        self.lock = threading.Lock()
-    
+        self._state = (0, 0)
+
+    @property
+    def current_page(self):
+        return self._state[0]
+
+    @property
+    def total_pages(self):
+        return self._state[1]
+
     def set_total(self, total):
-        with self.lock:
-            self.total_pages = total
-    
+        self._state = (self._state[0], total)
+
     def update_page(self, page):
-        with self.lock:
-            self.current_page = page
-    
+        self._state = (page, self._state[1])
+
     def get_progress(self):
+        current, total = self._state
+        if not total:
+            return 0.0
+        return current * 100.0 / total
+
+    def get_progress_int(self):
+        """Progress in basis points (0..10000), using integer arithmetic only"""
+        current, total = self._state
+        if not total:
+            return 0
+        return min(current * 10000 // total, 10000)
+
+
+class ProgressEmitter:
+    """
+    Buffers JSON progress lines for stderr and writes them in batches
+
+    Lines are flushed once 32 are pending or 100 ms have passed since the last
+    write, so bursts (e.g. per-chunk updates) cost one write instead of one per
+    line while isolated updates still go out immediately. A progress update
+    whose status differs from the previous one (converting -> converted ->
+    chunking -> saved ...) is a phase change and flushes immediately, as does
+    force=True, so state transitions (and anything queued before them) are
+    never held back.
+
+    In pool workers `queue` is set and batches are handed to the parent
+    process instead (see forward()), so stderr has a single writer and lines
+    from different workers never interleave mid-line.
+    """
+    def __init__(self, max_lines=32, max_delay=0.1):
+        self.buffer = []
+        self.max_lines = max_lines
+        self.max_delay = max_delay
+        self.last_flush_ts = time.monotonic()
+        self.last_status = None
+        self.queue = None
+        self.lock = threading.Lock()  # Converter thread emits concurrently
+
+    def emit(self, message, force=False):
+        line = _dumpb_line(message)
+        status = message.get("status")
+        with self.lock:
+            self.buffer.append(line)
+            if status is not None and status != self.last_status:
+                self.last_status = status
+                force = True
+            if force or len(self.buffer) >= self.max_lines or time.monotonic() - self.last_flush_ts > self.max_delay:
+                self._write()
+
+    def forward(self, data):
+        """Write a batch of lines relayed from a pool worker"""
         with self.lock:
-            if self.total_pages == 0:
-                return 0.0
-            return (self.current_page / self.total_pages) * 100
+            self.buffer.append(data)
+            self._write()
 
+    def flush(self):
+        with self.lock:
+            self._write()
+
+    def _write(self):
+        if self.buffer:
+            data = b"".join(self.buffer)
+            self.buffer.clear()
+            if self.queue is not None:
+                self.queue.put(data)
+            else:
+                _write_stderr(data)
+        self.last_flush_ts = time.monotonic()
 
-def send_conversion_heartbeat(idx, total_files, filename, total_pages, interval=2, enrichments_enabled=0, device_type='unknown'):
+
+def _write_stderr(data, sync=True):
+    """
+    Write UTF-8 bytes straight to the stderr file descriptor
+
+    One os.write per batch skips TextIOWrapper's lock, encode and buffer
+    steps. With sync, text sys.stderr may still hold (only possible when it
+    isn't write-through onto a raw file) is flushed first so lines stay in
+    order; the signal handler passes sync=False since it can interrupt a
+    write in progress. Without a real descriptor (e.g. stderr replaced by a
+    harness) it falls back to sys.stderr.
     """
-    Send heartbeat updates during PDF conversion to show the process is active.
+    try:
+        fd = sys.stderr.fileno()
+    except (AttributeError, ValueError, io.UnsupportedOperation):
+        sys.stderr.write(data.decode('utf-8'))
+        sys.stderr.flush()
+        return
+
+    if sync and (not getattr(sys.stderr, 'write_through', False)
+                 or hasattr(getattr(sys.stderr, 'buffer', None), 'raw')):
+        sys.stderr.flush()
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+_emitter = ProgressEmitter()
+
+
+# Seconds between heartbeat updates while a conversion is running
+HEARTBEAT_INTERVAL = 2
+
+# Seconds a heartbeat reuses its list of child processes before rescanning
+CHILDREN_SCAN_INTERVAL = 10
+
+# psutil handles for this process's children, by pid (see ConversionHeartbeat.get_children)
+_CHILD_HANDLES = {}
+
+
+class ConversionHeartbeat:
+    """
+    Builds heartbeat updates during PDF conversion to show the process is active.
 
     Based on benchmarks: M3 Macs process ~1.26-1.5 seconds per page
     We use 1.5 seconds per page as conservative estimate for regular M3 (not Pro/Max)
@@ -74,25 +270,58 @@ def send_conversion_heartbeat(idx, total_files, filename, total_pages, interval=
     Enrichments significantly increase processing time:
     - Each enrichment adds ~0.5-2 seconds per page
     - AI Image Descriptions can add 5-10 seconds per page with images
-    """
-    start_time = time.time()
 
-    # Adjust time estimate based on enabled enrichments
-    # Base: 1.5s/page, each enrichment adds time
-    BASE_SECONDS_PER_PAGE = 1.5
-    enrichment_multiplier = 1.0 + (enrichments_enabled * 0.5)  # Each enrichment adds 50% more time
-    if enrichments_enabled >= 5:  # If many enrichments enabled, use more conservative estimate
-        enrichment_multiplier = 4.0  # 4x slower with all enrichments
-
-    SECONDS_PER_PAGE = BASE_SECONDS_PER_PAGE * enrichment_multiplier
-
-    process = psutil.Process(os.getpid())
-
-    def get_gpu_usage():
+    No thread of its own: whoever waits on the conversion calls payload()
+    every HEARTBEAT_INTERVAL seconds and emits the result.
+    """
+    def __init__(self, idx, total_files, filename, total_pages, enrichments_enabled=0, device_type='unknown'):
+        self.idx = idx
+        self.total_files = total_files
+        self.filename = filename
+        self.total_pages = total_pages
+        self.device_type = device_type
+        self.start_time = time.time()
+
+        # Adjust time estimate based on enabled enrichments
+        # Base: 1.5s/page, each enrichment adds time
+        BASE_SECONDS_PER_PAGE = 1.5
+        enrichment_multiplier = 1.0 + (enrichments_enabled * 0.5)  # Each enrichment adds 50% more time
+        if enrichments_enabled >= 5:  # If many enrichments enabled, use more conservative estimate
+            enrichment_multiplier = 4.0  # 4x slower with all enrichments
+
+        self.seconds_per_page = BASE_SECONDS_PER_PAGE * enrichment_multiplier
+
+        self.process = psutil.Process(os.getpid())
+        self.process.cpu_percent(None)  # Prime: later calls return the usage since the previous one
+
+        # The child process list barely changes during a conversion, so it's rescanned every few seconds
+        self.children_scan_ts = 0.0
+
+    def get_children(self):
+        """
+        Child processes (Docling spawns workers for vision models), rescanned at most every 10s
+
+        Handles are kept in _CHILD_HANDLES by pid across heartbeats (and parts),
+        so a rescan only creates psutil.Process objects for new children.
+        """
+        now = time.monotonic()
+        if now - self.children_scan_ts > CHILDREN_SCAN_INTERVAL:
+            try:
+                pids = {child.pid: child for child in self.process.children(recursive=True)}
+            except psutil.Error:
+                pids = {}
+            for pid in _CHILD_HANDLES.keys() - pids.keys():
+                del _CHILD_HANDLES[pid]
+            for pid in pids.keys() - _CHILD_HANDLES.keys():
+                _CHILD_HANDLES[pid] = pids[pid]
+            self.children_scan_ts = now
+        return _CHILD_HANDLES.values()
+
+    def get_gpu_usage(self):
         """Get GPU usage percentage - cross-platform best effort"""
         try:
             # For NVIDIA GPUs (CUDA)
-            if device_type.startswith('cuda'):
+            if self.device_type.startswith('cuda'):
                 try:
                     import pynvml
                     pynvml.nvmlInit()
@@ -109,49 +338,43 @@ def send_conversion_heartbeat(idx, total_files, filename, total_pages, interval=
         except:
             return None
 
-    while getattr(threading.current_thread(), "do_run", True):
-        time.sleep(interval)
-        if not getattr(threading.current_thread(), "do_run", True):
-            break
-
-        elapsed = int(time.time() - start_time)
+    def payload(self):
+        """Build one heartbeat progress update"""
+        elapsed = int(time.time() - self.start_time)
+        total_pages = self.total_pages
 
         # Calculate estimates
-        estimated_total_seconds = int(total_pages * SECONDS_PER_PAGE) if total_pages > 0 else 0
+        estimated_total_seconds = int(total_pages * self.seconds_per_page) if total_pages > 0 else 0
         remaining_seconds = max(0, estimated_total_seconds - elapsed)
         progress_percent = min(95, (elapsed / estimated_total_seconds * 100)) if estimated_total_seconds > 0 else 0
 
         # Get memory and CPU usage to prove process is active
         try:
             # Track memory for parent process
-            mem_info = process.memory_info()
-            cpu_percent = process.cpu_percent(interval=0.1)
+            mem_info = self.process.memory_info()
+            cpu_percent = self.process.cpu_percent(None)  # Non-blocking, since the last heartbeat
             memory_mb = mem_info.rss / 1024 / 1024  # Convert to MB
 
-            # Also track child processes (Docling spawns workers for vision models)
+            # Also track child processes
             try:
-                children = process.children(recursive=True)
-                for child in children:
-                    try:
-                        child_mem = child.memory_info()
-                        memory_mb += child_mem.rss / 1024 / 1024
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-            except:
-                pass
+                memory_mb += sum(
+                    child.memory_info().rss for child in list(self.get_children()) if child.is_running()
+                ) / 1024 / 1024
+            except psutil.Error:
+                self.children_scan_ts = 0.0  # A child exited - rescan on the next heartbeat
         except:
             cpu_percent = 0
             memory_mb = 0
 
         # Get GPU usage (NVIDIA only - MPS not accessible without sudo)
-        gpu_percent = get_gpu_usage()
+        gpu_percent = self.get_gpu_usage()
 
-        # Send heartbeat to show we're alive
-        progress = {
+        # Heartbeat to show we're alive
+        return {
             "type": "progress",
-            "current": idx,
-            "total": total_files,
-            "file": filename,
+            "current": self.idx,
+            "total": self.total_files,
+            "file": self.filename,
             "status": "converting",
             "total_pages": total_pages,
             "elapsed": elapsed,
@@ -163,199 +386,1534 @@ def send_conversion_heartbeat(idx, total_files, filename, total_pages, interval=
             "memory_mb": round(memory_mb, 1),
             "gpu_percent": round(gpu_percent, 1) if gpu_percent is not None else None,
             "is_active": cpu_percent > 0,  # If CPU > 0, process is actively working
-            "device": device_type  # Show what hardware is being used
+            "device": self.device_type  # Show what hardware is being used
         }
-        print(json.dumps(progress), file=sys.stderr, flush=True)
-        sys.stderr.flush()
+
+
+@contextlib.contextmanager
+def open_pdf(pdf_path):
+    """
+    Open a PDF with pypdf over a read-only memory map
+
+    pypdf does many small seek/read calls while locating the xref table and
+    trailer. On a memory map those are served from the page cache instead of
+    separate syscalls, and the file is never copied into the Python heap.
+    The reader is only valid inside the with block.
+    """
+    with open(pdf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield pypdf.PdfReader(mapped)
 
 
 def get_pdf_page_count(pdf_path):
-    """Get the number of pages in a PDF file"""
+    """Get the number of pages in a PDF file (path or in-memory DocumentStream)"""
     try:
-        with open(pdf_path, 'rb') as f:
-            pdf = pypdf.PdfReader(f)
-            return len(pdf.pages)
+        if isinstance(pdf_path, DocumentStream):
+            data = pdf_path.stream.getvalue()
+            if fitz is not None:
+                with fitz.open(stream=data, filetype="pdf") as pdf:
+                    return pdf.page_count
+            return len(pypdf.PdfReader(io.BytesIO(data)).pages)
+
+        stat = os.stat(pdf_path)
+        return _cached_pdf_page_count(str(pdf_path), stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         return None
 
 
+# Keyed by (path, mtime, size), so a file is only parsed again once it changes
+@functools.lru_cache(maxsize=512)
+def _cached_pdf_page_count(pdf_path, mtime_ns, size):
+    return _read_pdf_page_count(pdf_path)
+
+
+def _read_pdf_page_count(pdf_path):
+    """Count pages with the fastest available backend (PyMuPDF, pikepdf, then pypdf)"""
+    if fitz is not None:
+        with fitz.open(pdf_path) as pdf:
+            return pdf.page_count
+    if pikepdf is not None:
+        with pikepdf.open(pdf_path, access_mode=pikepdf.AccessMode.mmap) as pdf:
+            return len(pdf.pages)
+    with open_pdf(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+# Sources above this size are split without recompressing the parts
+FAST_SPLIT_MIN_BYTES = 500 * 1024 * 1024
+
+
+@contextlib.contextmanager
+def _pdf_range_writer(pdf_path):
+    """
+    Open a PDF once and yield write(start_page, end_page, out_path=None)
+
+    Pages [start_page, end_page) are copied into a new PDF at out_path, or
+    returned as bytes when out_path is None. PyMuPDF copies page streams in C;
+    pypdf is used when it isn't installed.
+    """
+    if fitz is not None:
+        # Parts are intermediate files: for very large sources skip recompressing
+        # and garbage-collecting objects, which dominates on image-heavy scans
+        if os.path.getsize(pdf_path) > FAST_SPLIT_MIN_BYTES:
+            save_options = {"deflate": False, "garbage": 0, "linear": False}
+        else:
+            save_options = {"deflate": True, "garbage": 3, "linear": False}
+
+        with fitz.open(pdf_path) as src:
+            def write(start_page, end_page, out_path=None):
+                with fitz.open() as out:
+                    out.insert_pdf(src, from_page=start_page, to_page=end_page - 1)
+                    if out_path is None:
+                        return out.tobytes(**save_options)
+                    out.save(out_path, **save_options)
+            yield write
+        return
+
+    with open_pdf(pdf_path) as pdf:
+        def write(start_page, end_page, out_path=None):
+            writer = pypdf.PdfWriter()
+            for page_num in range(start_page, end_page):
+                writer.add_page(pdf.pages[page_num])
+            if out_path is None:
+                buffer = io.BytesIO()
+                writer.write(buffer)
+                return buffer.getvalue()
+            with open(out_path, 'wb') as out_file:
+                writer.write(out_file)
+        yield write
+
+
+def classify_pdf(pdf_path, sample_ratio=0.1, min_sample_pages=3, min_chars_per_page=100):
+    """
+    Triage a PDF by sampling its pages for an embedded text layer and images
+
+    Born-digital PDFs already contain machine-readable text, so running OCR on
+    them only repeats the most expensive stage of the pipeline; PDFs without
+    any images don't need the picture classification/description models.
+
+    Args:
+        pdf_path: Path to the PDF file
+        sample_ratio: Fraction of pages (spread across the document) to inspect
+        min_sample_pages: Inspect at least this many pages
+        min_chars_per_page: Average non-whitespace characters above which a PDF has a text layer
+
+    Returns:
+        Dict with has_text, has_images and scanned (True = needs OCR). When the
+        PDF can't be inspected, everything is assumed present so nothing is skipped.
+    """
+    unknown = {"has_text": False, "has_images": True, "scanned": True}
+
+    def sample(total_pages):
+        count = min(total_pages, max(min_sample_pages, int(total_pages * sample_ratio)))
+        step = max(1, total_pages // count)
+        return range(0, total_pages, step)[:count]
+
+    try:
+        if fitz is not None:
+            with fitz.open(pdf_path) as pdf:
+                if pdf.page_count == 0:
+                    return unknown
+                sampled = sample(pdf.page_count)
+                text_chars = 0
+                has_images = False
+                for page_num in sampled:
+                    page = pdf[page_num]
+                    text_chars += len(''.join(page.get_text("text").split()))
+                    has_images = has_images or bool(page.get_images())
+        else:
+            # pypdf can't cheaply tell whether a page has images - assume it does
+            with open_pdf(pdf_path) as pdf:
+                total_pages = len(pdf.pages)
+                if total_pages == 0:
+                    return unknown
+                sampled = sample(total_pages)
+                text_chars = sum(
+                    len(''.join((pdf.pages[page_num].extract_text() or '').split()))
+                    for page_num in sampled
+                )
+                has_images = True
+
+        has_text = text_chars / len(sampled) > min_chars_per_page
+        return {"has_text": has_text, "has_images": has_images, "scanned": not has_text}
+    except Exception:
+        return unknown
+
+
+# Triage is looked up once when ordering the files and again when converting
+@functools.lru_cache(maxsize=512)
+def _cached_classify_pdf(pdf_path, mtime_ns, size):
+    return classify_pdf(pdf_path)
+
+
+def triage_file_options(doc_path, pipeline_options_dict):
+    """
+    Pipeline options for one document after triage
+
+    OCR and the picture models are switched off for PDFs that don't need them
+    (see classify_pdf). Non-PDFs, and runs where none of those is enabled,
+    are returned unchanged without opening the file.
+
+    Returns:
+        (file_options, triage) - triage is None when the file wasn't inspected
+    """
+    triage_options = ("enable_ocr", "enable_picture_classification", "enable_picture_description")
+    if Path(doc_path).suffix.lower() != '.pdf' or not any(pipeline_options_dict[k] for k in triage_options):
+        return pipeline_options_dict, None
+
+    try:
+        stat = os.stat(doc_path)
+        triage = _cached_classify_pdf(str(doc_path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        triage = classify_pdf(str(doc_path))
+    file_options = {
+        **pipeline_options_dict,
+        "enable_ocr": pipeline_options_dict["enable_ocr"] and triage["scanned"],
+        "enable_picture_classification": pipeline_options_dict["enable_picture_classification"] and triage["has_images"],
+        "enable_picture_description": pipeline_options_dict["enable_picture_description"] and triage["has_images"]
+    }
+    return file_options, triage
+
+
 def get_progress_file_path(output_file):
     """Get the path to the progress file for resuming"""
     output_path = Path(output_file)
     return output_path.parent / f".progress_{output_path.stem}.json"
 
 
-def save_progress(output_file, completed_chunks, current_file_idx, total_files, config):
+def get_progress_log_path(output_file):
+    """Get the path to the append-only log of completed part paths"""
+    output_path = Path(output_file)
+    return output_path.parent / f".progress_{output_path.stem}.parts.jsonl"
+
+
+class ProgressLog:
+    """
+    Append-only log of completed part paths, one JSON line per part
+
+    The progress file only records how many parts are complete, so saving
+    progress no longer rewrites every path completed so far. The log is
+    rewritten once when a session starts (from the paths loaded on resume);
+    lines past the recorded count - appended just before a crash - are
+    ignored by load_progress.
+    """
+    def __init__(self, output_file, completed=()):
+        self.file = open(get_progress_log_path(output_file), 'wb', buffering=1 << 16)
+        self.append(completed)
+
+    def append(self, paths):
+        try:
+            self.file.write(b"".join(_dumpb_line({"path": path}) for path in paths))
+            self.file.flush()
+        except Exception as e:
+            _emitter.emit({"error": f"Failed to save progress log: {str(e)}"})
+
+    def close(self):
+        self.file.close()
+
+
+def save_progress(output_file, completed_parts, current_file_idx, total_files, config, total_chunks=0, chunks_file_size=0):
     """
     Save progress to disk for resuming later
 
     Args:
         output_file: Path to the output chunks file
-        completed_chunks: List of completed chunk paths
+        completed_parts: Number of completed parts (their paths are in the ProgressLog)
         current_file_idx: Current file being processed
         total_files: Total number of files
         config: Configuration dict
+        total_chunks: Number of chunks saved so far
+        chunks_file_size: Size of the JSON-Lines chunk file after the last saved part
+    """
+    progress_file = get_progress_file_path(output_file)
+    progress_data = {
+        "output_file": output_file,
+        "completed_parts": completed_parts,
+        "current_file_idx": current_file_idx,
+        "total_files": total_files,
+        "config": config,
+        "total_chunks": total_chunks,
+        "chunks_file_size": chunks_file_size,
+        "timestamp": time.time()
+    }
+    try:
+        with open(progress_file, 'wb') as f:
+            if orjson is not None:
+                f.write(orjson.dumps(progress_data, option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(progress_data, indent=2).encode('utf-8'))
+    except Exception as e:
+        _emitter.emit({"error": f"Failed to save progress: {str(e)}"})
+
+
+def load_progress(output_file):
+    """
+    Load progress from disk if resuming
+
+    Returns:
+        Progress data dict or None if no progress exists
+    """
+    progress_file = get_progress_file_path(output_file)
+    if not progress_file.exists():
+        return None
+
+    try:
+        with open(progress_file, 'rb') as f:
+            progress_data = _loads(f.read())
+
+        # Check if progress is recent (within 7 days)
+        age_days = (time.time() - progress_data.get("timestamp", 0)) / 86400
+        if age_days > 7:
+            _emitter.emit({"info": "Progress file too old (>7 days), starting fresh"})
+            return None
+
+        # Older progress files list the paths inline
+        if "completed_chunks" not in progress_data:
+            completed_parts = progress_data.get("completed_parts", 0)
+            with open(get_progress_log_path(output_file), 'rb') as f:
+                lines = itertools.islice(f, completed_parts)
+                progress_data["completed_chunks"] = [_loads(line)["path"] for line in lines]
+            if len(progress_data["completed_chunks"]) < completed_parts:
+                raise ValueError("progress log is shorter than recorded")
+
+        return progress_data
+    except Exception as e:
+        _emitter.emit({"error": f"Failed to load progress: {str(e)}"})
+        return None
+
+
+def clear_progress(output_file):
+    """Clear progress file after successful completion"""
+    for progress_file in (get_progress_file_path(output_file), get_progress_log_path(output_file)):
+        try:
+            if progress_file.exists():
+                progress_file.unlink()
+        except:
+            pass
+
+
+def _write_pdf_chunk(job):
+    """
+    Write pages [start_page, end_page) of a PDF to out_path (pool worker)
+
+    Top-level so it can be pickled; each call opens its own copy of the source.
+    """
+    pdf_path, start_page, end_page, out_path = job
+    with _pdf_range_writer(pdf_path) as write_pages:
+        write_pages(start_page, end_page, out_path)
+    if fitz is not None:
+        fitz.TOOLS.store_shrink(100)  # Drop PyMuPDF's object cache between parts
+    return out_path
+
+
+# Sources up to this size are split in memory instead of into temp files
+IN_MEMORY_SPLIT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def get_split_dir(pdf_path):
+    """Directory split parts of a PDF are written to (also their resume key prefix)"""
+    return Path(pdf_path).parent / f".chunks_{Path(pdf_path).stem}"
+
+
+def get_part_key(part, pdf_path):
+    """Path identifying a part in the progress file, whether it's on disk or in memory"""
+    if isinstance(part, DocumentStream):
+        return str(get_split_dir(pdf_path) / part.name)
+    return part
+
+
+def is_split_part(part_key, pdf_path):
+    """
+    True if part_key names a split part of pdf_path
+
+    Matches the exact part-name pattern from split_pdf() rather than a path
+    prefix, which would also match the parts of "foobar.pdf" for "foo.pdf".
+    """
+    part_key = Path(part_key)
+    if part_key.parent != get_split_dir(pdf_path):
+        return False
+    stem = re.escape(Path(pdf_path).stem)
+    return re.fullmatch(rf"{stem}_chunk\d+_p\d+-\d+\.pdf", part_key.name) is not None
+
+
+def split_pdf(pdf_path, pages_per_chunk=100):
+    """
+    Split a large PDF into smaller chunks for memory-efficient processing
+
+    Parts of sources up to IN_MEMORY_SPLIT_MAX_BYTES are kept in memory as
+    DocumentStreams, so they are handed to the converter without a write and
+    re-read; larger sources are split into files under get_split_dir().
+
+    Args:
+        pdf_path: Path to the PDF file
+        pages_per_chunk: Number of pages per chunk (default 100)
+
+    Returns:
+        List of (part, page_count) tuples, where part is a chunk file path
+        or a DocumentStream (the source path itself when nothing is split)
+    """
+    try:
+        total_pages = get_pdf_page_count(pdf_path)
+        if total_pages is None:
+            raise ValueError("could not read page count")
+
+        if total_pages <= pages_per_chunk:
+            # No need to split
+            return [(pdf_path, total_pages)]
+
+        pdf_name = Path(pdf_path).stem
+        temp_dir = get_split_dir(pdf_path)
+        in_memory = os.path.getsize(pdf_path) <= IN_MEMORY_SPLIT_MAX_BYTES
+        if not in_memory:
+            # Create temp directory for chunks
+            temp_dir.mkdir(exist_ok=True)
+
+        chunk_paths = []
+        num_chunks = (total_pages + pages_per_chunk - 1) // pages_per_chunk
+
+        _emitter.emit({
+            "info": f"Splitting {total_pages}-page PDF into {num_chunks} chunks of ~{pages_per_chunk} pages",
+            "reason": "Large PDF with AI descriptions - processing in chunks to prevent out-of-memory"
+        })
+
+        jobs = []
+        for chunk_idx in range(num_chunks):
+            start_page = chunk_idx * pages_per_chunk
+            end_page = min(start_page + pages_per_chunk, total_pages)
+            chunk_path = temp_dir / f"{pdf_name}_chunk{chunk_idx+1:03d}_p{start_page+1}-{end_page}.pdf"
+            jobs.append((pdf_path, start_page, end_page, str(chunk_path)))
+
+        def report(chunk_idx, start_page, end_page, chunk_path):
+            chunk_paths.append((chunk_path, end_page - start_page))
+            _emitter.emit({
+                "info": f"Created chunk {chunk_idx+1}/{num_chunks}: pages {start_page+1}-{end_page}"
+            })
+
+        if in_memory:
+            with _pdf_range_writer(pdf_path) as write_pages:
+                for chunk_idx, (_, start_page, end_page, chunk_path) in enumerate(jobs):
+                    data = write_pages(start_page, end_page)
+                    report(chunk_idx, start_page, end_page,
+                           DocumentStream(name=Path(chunk_path).name, stream=io.BytesIO(data)))
+        elif num_chunks >= 3:
+            # Write the parts in parallel, each worker reading its own copy of the source
+            with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4)) as executor:
+                for chunk_idx, (job, chunk_path) in enumerate(zip(jobs, executor.map(_write_pdf_chunk, jobs))):
+                    report(chunk_idx, job[1], job[2], chunk_path)
+        else:
+            with _pdf_range_writer(pdf_path) as write_pages:
+                for chunk_idx, (_, start_page, end_page, chunk_path) in enumerate(jobs):
+                    write_pages(start_page, end_page, chunk_path)
+                    report(chunk_idx, start_page, end_page, chunk_path)
+
+        return chunk_paths
+
+    except Exception as e:
+        _emitter.emit({
+            "error": f"Failed to split PDF: {str(e)}"
+        })
+        return [(pdf_path, get_pdf_page_count(pdf_path))]  # Fall back to processing whole file
+
+
+def get_chunks_file_path(output_file):
+    """Get the path to the JSON-Lines file chunks are streamed to while processing"""
+    return f"{output_file}.chunks.jsonl"
+
+
+def get_chunks_meta_path(output_file):
+    """Get the path to the small header file kept next to the JSON-Lines chunk file"""
+    return f"{output_file}.meta.json"
+
+
+def save_chunks_meta(output_file, total_chunks):
+    """
+    Atomically update the chunk file's header ({"method", "total_chunks"})
+
+    Lets other readers use the JSON-Lines file while a run is still going,
+    without scanning it to count the chunks.
+    """
+    meta_file = get_chunks_meta_path(output_file)
+    tmp_file = f"{meta_file}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(_dumpb({"method": "docling-hybrid", "total_chunks": total_chunks}))
+        os.replace(tmp_file, meta_file)
+    except Exception as e:
+        _emitter.emit({"warning": f"Failed to save chunk file header: {str(e)}"})
+
+
+# Chunks are serialized and written in batches of this many
+CHUNK_BATCH_SIZE = 32
+
+# Appended parts are flushed and recorded in the progress file once this many
+# chunks (or bytes) are pending, or this many seconds have passed since the
+# last commit, instead of after every part (defaults for --save-every-*)
+COMMIT_MAX_CHUNKS = 64
+COMMIT_MAX_BYTES = 1 << 20
+COMMIT_MAX_SECS = 5.0
+
+# Output files with these suffixes are written as JSON Lines (one chunk per
+# line) instead of a single JSON document
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+class SinkWriter:
+    """
+    Appends chunks to the JSON-Lines chunk file (one chunk per line)
+
+    The file is opened once per run and truncated to `size` bytes: 0 for a
+    fresh run, or the size recorded in the progress file when resuming, which
+    drops any part that was half-written by a crash. Lines are written in
+    batches of CHUNK_BATCH_SIZE instead of re-reading and rewriting
+    everything saved so far.
+
+    The file is unbuffered (batches are already joined into one write), so
+    its size is simply the bytes written since the truncate, and a failed
+    commit can be cut back without a buffer flushing the lines again later.
+
+    append() only buffers; commit() flushes everything appended since the
+    previous commit. The caller commits once should_commit() says enough is
+    pending, so several small parts share one flush and one progress save.
+    """
+    def __init__(self, output_file, size=0, max_chunks=COMMIT_MAX_CHUNKS, max_secs=COMMIT_MAX_SECS):
+        self.file = open(get_chunks_file_path(output_file), 'ab', buffering=0)
+        self.file.truncate(size)
+        self.size = size
+        self.committed_size = size
+        self.pending = []
+        self.uncommitted_chunks = 0
+        self.uncommitted_bytes = 0
+        self.max_chunks = max_chunks
+        self.max_secs = max_secs
+        self.last_commit_ts = time.monotonic()
+
+    def append(self, chunks):
+        """
+        Queue one part's chunks for the chunk file (durable once commit() succeeds)
+
+        Chunks are dicts, or lines already serialized by a pool worker. The
+        whole part is serialized before anything is queued, so a chunk that
+        fails to serialize leaves no lines of its part behind.
+        """
+        lines = [chunk if isinstance(chunk, bytes) else _dumpb_line(chunk) for chunk in chunks]
+        self.pending.extend(lines)
+        self.uncommitted_chunks += len(lines)
+        self.uncommitted_bytes += sum(map(len, lines))
+        if len(self.pending) >= CHUNK_BATCH_SIZE:
+            self._write_pending()
+
+    def should_commit(self):
+        return (self.uncommitted_chunks >= self.max_chunks
+                or self.uncommitted_bytes >= COMMIT_MAX_BYTES
+                or time.monotonic() - self.last_commit_ts >= self.max_secs)
+
+    def commit(self):
+        """
+        Flush the chunks appended since the last commit to disk
+
+        Returns:
+            Size of the chunk file after the commit, or None if saving failed
+            (the file is then cut back to the previous commit)
+        """
+        try:
+            self._write_pending()
+            self.committed_size = self.size
+            return self.committed_size
+        except Exception as e:
+            _emitter.emit({"error": f"Failed to save chunks: {str(e)}"})
+            self.pending.clear()
+            with contextlib.suppress(Exception):
+                self.file.truncate(self.committed_size)
+            self.size = self.committed_size
+            return None
+        finally:
+            self.uncommitted_chunks = 0
+            self.uncommitted_bytes = 0
+            self.last_commit_ts = time.monotonic()
+
+    def _write_pending(self):
+        if self.pending:
+            data = memoryview(b"".join(self.pending))
+            self.pending.clear()
+            while data:
+                written = self.file.write(data)
+                self.size += written
+                data = data[written:]
+
+    def close(self):
+        """Write any residual lines and close the file (safe to call twice)"""
+        if not self.file.closed:
+            try:
+                self._write_pending()
+            finally:
+                self.file.close()
+
+
+def _chunk_dict(chunk):
+    """Chunk as a dict, parsing it if a pool worker already serialized it"""
+    return _loads(chunk) if isinstance(chunk, bytes) else chunk
+
+
+def finalize_output(output_file, total_chunks, config):
+    """
+    Assemble the single JSON output file from the JSON-Lines chunk file
+
+    Chunk lines are already serialized, so they are copied into the "chunks"
+    array as-is instead of being parsed and re-encoded. An output_file ending
+    in .gz is gzip-compressed (level 1 - the repetitive JSON compresses well
+    even at the fastest setting).
+
+    An output_file ending in .ndjson/.jsonl skips the assembly: the chunk file
+    already has that format, so it is just moved into place, and the header
+    (method, config, total_chunks) is left in the .meta.json file next to it.
+
+    Args:
+        output_file: Path to JSON output file
+        total_chunks: Number of chunks in the chunk file
+        config: Configuration dict stored alongside the chunks
+    """
+    chunks_file = get_chunks_file_path(output_file)
+    header = {
+        "method": "docling-hybrid",
+        "config": config,
+        "total_chunks": total_chunks
+    }
+
+    if output_file.endswith(NDJSON_SUFFIXES):
+        meta_file = get_chunks_meta_path(output_file)
+        with open(f"{meta_file}.tmp", 'wb') as f:
+            f.write(_dumpb(header))
+        with open(chunks_file, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(chunks_file, output_file)
+        os.replace(f"{meta_file}.tmp", meta_file)
+        return
+
+    # Reopen the header object so "chunks" can be streamed in as the last key
+    prefix = _dumpb(header)[:-1] + b',"chunks":['
+
+    # Written to a temp file and moved into place, so a crash mid-write never
+    # leaves a truncated output behind (the chunk file is kept until then)
+    tmp_file = f"{output_file}.tmp"
+    with open(chunks_file, 'rb', buffering=1 << 20) as src, open(tmp_file, 'wb', buffering=1 << 20) as raw:
+        if output_file.endswith('.gz'):
+            dst = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1)
+        else:
+            dst = contextlib.nullcontext(raw)
+        with dst as dst:
+            dst.write(prefix)
+            separator = b""
+            for line in src:
+                line = line.rstrip(b"\n")
+                if line:
+                    dst.write(separator)
+                    dst.write(line)
+                    separator = b","
+            dst.write(b"]}")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_file, output_file)
+
+    os.remove(chunks_file)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(get_chunks_meta_path(output_file))
+
+
+def _build_pipeline_options(options, verbose=False):
+    """
+    Build PdfPipelineOptions from a plain options dict
+
+    Docling option objects don't always pickle cleanly, so worker processes
+    receive the options as a dict and rebuild them on their side.
+
+    Args:
+        options: Dict of enrichment flags and batch sizes (see chunk_documents)
+        verbose: If True, log which enrichments are enabled
+    """
+    from docling.datamodel.pipeline_options import (
+        PdfPipelineOptions,
+        AcceleratorOptions,
+        PictureDescriptionVlmOptions
+    )
+
+    def log(message):
+        if verbose:
+            _emitter.emit(message)
+
+    processing_batch_size = options["processing_batch_size"]
+    vision_batch_size = options["vision_batch_size"]
+
+    # Configure accelerator with auto-detection for cross-platform compatibility
+    # Will automatically select: CUDA (NVIDIA), MPS (Apple Silicon), or CPU
+    accelerator_options = AcceleratorOptions(
+        device='auto',  # Auto-detect best available device
+        num_threads=8   # Optimize for modern CPUs (adjust based on cores)
+    )
+
+    # CRITICAL: Use configurable batch sizes to balance speed vs memory
+    # Large batch sizes = faster for small docs, but cause OOM on large docs
+    # Docling loads entire batches into RAM simultaneously
+    pipeline_options = PdfPipelineOptions(
+        accelerator_options=accelerator_options,
+        # User-configurable batch sizes for performance tuning
+        ocr_batch_size=processing_batch_size,       # User-defined (default: 4)
+        layout_batch_size=processing_batch_size,    # User-defined (default: 4)
+        table_batch_size=processing_batch_size      # User-defined (default: 4)
+    )
+
+    # Docling's document/page batching is a global setting, so it's applied
+    # here to reach every process that builds a converter. Documents are
+    # converted one at a time: the only multi-document convert_all calls are
+    # the parts of a split PDF, which are split to bound peak memory, so
+    # converting them side by side would defeat the split (parallelism across
+    # files comes from num_workers instead).
+    try:
+        from docling.datamodel.settings import settings
+
+        settings.perf.doc_batch_size = options["doc_batch_size"]
+        settings.perf.doc_batch_concurrency = 1
+        settings.perf.page_batch_size = options["page_batch_size"]
+        settings.perf.page_batch_concurrency = 4
+        log({
+            "info": "Docling batch concurrency configured",
+            "doc_batch_size": options["doc_batch_size"],
+            "page_batch_size": options["page_batch_size"]
+        })
+    except (ImportError, AttributeError):
+        log({"warning": "Docling batch concurrency settings not available in this version"})
+
+    # Enable formula enrichment for mathematical equations
+    if options["enable_formula"]:
+        pipeline_options.do_formula_enrichment = True
+        log({"info": "Formula enrichment enabled - will extract LaTeX from equations"})
+
+    # Enable picture classification (identifies chart types, diagrams, etc.)
+    if options["enable_picture_classification"]:
+        pipeline_options.do_picture_classification = True
+        log({"info": "Picture classification enabled"})
+
+    # Enable picture description (generates captions using vision models)
+    if options["enable_picture_description"]:
+        # Use lightweight SmolVLM model with optimized batch size for M3 GPU
+        try:
+            from docling.datamodel.pipeline_options import smolvlm_picture_description
+
+            # CRITICAL: Use configurable batch size to balance speed vs memory
+            # Large batches load many images into RAM/VRAM simultaneously
+            # For large documents (100+ pages), large batch sizes can cause OOM
+            # Default batch_size is 8, we use user-defined (default 4) for customization
+            optimized_vlm_config = PictureDescriptionVlmOptions(
+                batch_size=vision_batch_size,   # User-defined (default: 4)
+                scale=2,  # Keep default
+                picture_area_threshold=0.05,  # Keep default
+                repo_id='HuggingFaceTB/SmolVLM-256M-Instruct',
+                prompt='Describe this image in a few sentences.',
+                generation_config={
+                    'max_new_tokens': options["picture_description_max_tokens"],  # User-configurable
+                    'do_sample': False
+                }
+            )
+
+            pipeline_options.do_picture_description = True
+            pipeline_options.picture_description_options = optimized_vlm_config
+            log({
+                "info": "Picture description enabled using SmolVLM (256M model)",
+                "batch_size": vision_batch_size,
+                "max_tokens_per_image": options["picture_description_max_tokens"],
+                "note": f"Batch size {vision_batch_size} - balance speed vs memory usage"
+            })
+        except ImportError:
+            log({"warning": "Picture description requested but SmolVLM not available"})
+
+    # Enable code enrichment for code blocks
+    if options["enable_code_enrichment"]:
+        pipeline_options.do_code_enrichment = True
+        log({"info": "Code enrichment enabled - will extract and format code blocks"})
+
+    # Control OCR (text recognition for scanned documents)
+    pipeline_options.do_ocr = options["enable_ocr"]
+    if options["enable_ocr"]:
+        log({
+            "info": "OCR enabled - will extract text from scanned images",
+            "note": "Skipped automatically for PDFs that already contain a text layer"
+        })
+    else:
+        log({"info": "OCR disabled - will only extract native text"})
+
+    # Control table structure extraction
+    pipeline_options.do_table_structure = options["enable_table_structure"]
+    if options["enable_table_structure"]:
+        log({"info": "Table structure enabled - will preserve table layouts"})
+    else:
+        log({"info": "Table structure disabled - tables will be treated as plain text"})
+
+    return pipeline_options
+
+
+# Converters and chunkers are cached per process (keyed by their settings), so a
+# pool worker or a --daemon process builds each one once and keeps the models
+# loaded. Toggling an enrichment flag only builds the converter it needs.
+@functools.lru_cache(maxsize=8)
+def _build_converter(options_key):
+    from docling.document_converter import PdfFormatOption
+
+    options = dict(options_key)
+    pipeline_options = _build_pipeline_options(options)
+    converter = DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+        }
+    )
+    _configure_torch()
+    if options.get("enable_vlm_quantization") and options["enable_picture_description"]:
+        _quantize_vlm(converter)
+    if options.get("enable_torch_compile"):
+        _compile_models(converter)
+    return converter
+
+
+@functools.lru_cache(maxsize=None)
+def _configure_torch():
+    """
+    Process-wide torch settings for inference, applied once before the first model loads
+
+    TF32 matmuls and cuDNN autotuning only take effect on CUDA; elsewhere they are no-ops.
+    """
+    try:
+        import torch
+
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
+    except Exception:
+        pass
+
+
+def _iter_torch_modules(stage):
+    """Yield (owner, attribute, module) for the torch models held by a pipeline stage"""
+    import torch
+
+    owners = [stage] + [v for v in vars(stage).values() if hasattr(v, "__dict__") and not isinstance(v, torch.nn.Module)]
+    for owner in owners:
+        for name, value in vars(owner).items():
+            if isinstance(value, torch.nn.Module):
+                yield owner, name, value
+
+
+def _compile_models(converter):
+    """
+    Compile the PDF pipeline's torch models (layout, table structure, VLM) with torch.compile
+
+    Docling doesn't expose its models, so the pipeline is built eagerly and each
+    nn.Module found on its stages (or one level below, e.g. the layout predictor)
+    is replaced by its compiled version. Dynamo errors fall back to eager mode
+    per graph, so an unsupported model only costs the attempt.
+
+    Returns:
+        Number of models compiled
+    """
+    compiled = 0
+    try:
+        import torch
+        import torch._dynamo
+
+        torch._dynamo.config.suppress_errors = True
+        converter.initialize_pipeline(InputFormat.PDF)
+        pipeline = converter._get_pipeline(InputFormat.PDF)
+        stages = list(getattr(pipeline, "build_pipe", ())) + list(getattr(pipeline, "enrichment_pipe", ()))
+        for stage in stages:
+            for owner, name, module in list(_iter_torch_modules(stage)):
+                on_cuda = any(p.is_cuda for p in itertools.islice(module.parameters(), 1))
+                if on_cuda:
+                    module = module.to(memory_format=torch.channels_last)
+                setattr(owner, name, torch.compile(
+                    module, mode="reduce-overhead" if on_cuda else "default", dynamic=True
+                ))
+                compiled += 1
+        _emitter.emit({"info": f"torch.compile enabled for {compiled} model(s)"})
+    except Exception as e:
+        _emitter.emit({"warning": f"torch.compile unavailable, using eager mode: {str(e)}"})
+    return compiled
+
+
+def _autocast_dtype(device_type, enabled=True):
+    """Reduced precision dtype name used on this device (None = FP32)"""
+    if not enabled:
+        return None
+    if device_type.startswith('cuda'):
+        return "float16"
+    if device_type == 'mps':
+        return "bfloat16"
+    return None  # CPU keeps FP32 (int8 VLM quantization is the CPU speed path)
+
+
+@contextlib.contextmanager
+def _inference_context(device_type='cpu', dtype=None):
+    """
+    torch.inference_mode(), plus autocast to dtype on GPUs
+
+    Autocast is used instead of casting the weights: Docling's preprocessors
+    hand the models FP32 tensors, which half-precision weights would reject.
+    Without torch (or if autocast isn't supported for this device/dtype pair)
+    this degrades to inference_mode alone or a no-op.
+
+    Both modes are thread-local: they cover model calls made on the entering
+    thread only, not stages Docling runs on threads of its own.
+    """
+    try:
+        import torch
+    except ImportError:
+        yield
+        return
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(torch.inference_mode())
+        if dtype is not None:
+            try:
+                stack.enter_context(torch.autocast(device_type=device_type.split(':')[0], dtype=getattr(torch, dtype)))
+            except Exception:
+                pass  # Older torch without autocast support for this device
+        yield
+
+
+def _prewarm_converter(pipeline_options_dict, doc_path, device='cpu'):
+    """
+    Build the (cached) converter for doc_path and load its PDF pipeline models ahead of time
+
+    The options are triaged for doc_path first, so the converter is the one
+    its conversion will look up (and born-digital PDFs don't load OCR models
+    they won't use). On GPUs a blank one-page PDF is also converted, so kernel
+    compilation and allocator warm-up don't land on the first real document.
+    Failures are ignored - the first conversion then simply pays the cost itself.
+    """
+    try:
+        file_options, _ = triage_file_options(doc_path, pipeline_options_dict)
+        converter = _get_converter(file_options)
+        converter.initialize_pipeline(InputFormat.PDF)
+        if device != 'cpu' and fitz is not None:
+            with fitz.open() as blank:
+                blank.new_page()
+                data = blank.tobytes()
+            converter.convert(DocumentStream(name="warmup.pdf", stream=io.BytesIO(data)))
+    except Exception as e:
+        _emitter.emit({"warning": f"Model pre-warm failed: {str(e)}"})
+
+
+def _quantize_vlm(converter):
+    """
+    Quantize the picture description VLM's Linear layers to int8 (CPU only)
+
+    Docling has no hook for loading the VLM quantized, so the PDF pipeline is
+    built eagerly and the loaded model is swapped for a dynamically quantized
+    copy (int8 weights, VNNI/AVX dot products). GPU devices keep their FP16/FP32
+    weights - dynamic quantization has no CUDA/MPS kernels.
+
+    Returns:
+        True if a model was quantized
+    """
+    try:
+        import torch
+
+        converter.initialize_pipeline(InputFormat.PDF)
+        pipeline = converter._get_pipeline(InputFormat.PDF)
+        for enrichment in getattr(pipeline, "enrichment_pipe", ()):
+            model = getattr(enrichment, "model", None)
+            if not isinstance(model, torch.nn.Module) or not hasattr(enrichment, "processor"):
+                continue  # Not the VLM (or the model isn't loaded)
+            if str(getattr(enrichment, "device", "cpu")) != "cpu":
+                _emitter.emit({"info": "VLM quantization skipped - only supported on CPU"})
+                return False
+            enrichment.model = torch.ao.quantization.quantize_dynamic(
+                model.float(), {torch.nn.Linear}, dtype=torch.qint8
+            )
+            _emitter.emit({"info": "Picture description model quantized to int8"})
+            return True
+    except Exception as e:
+        _emitter.emit({"warning": f"VLM quantization failed, using full precision: {str(e)}"})
+    return False
+
+
+@functools.lru_cache(maxsize=8)
+def _build_chunker(kwargs_key):
+    kwargs = dict(kwargs_key)
+    name = kwargs.get("tokenizer")
+    tokenizer = _load_tokenizer(name) if isinstance(name, str) else None
+    if tokenizer is None:
+        return HybridChunker(**kwargs)
+
+    # Hand the already loaded tokenizer to the chunker instead of the model name,
+    # so it doesn't hit the HuggingFace hub / disk cache again
+    try:
+        from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
+        kwargs["tokenizer"] = HuggingFaceTokenizer(tokenizer=tokenizer, max_tokens=kwargs.pop("max_tokens"))
+    except ImportError:
+        kwargs["tokenizer"] = tokenizer  # Older docling-core accepts the tokenizer object directly
+    return HybridChunker(**kwargs)
+
+
+def _get_converter(pipeline_options_dict):
+    """Get (or build) the DocumentConverter for these pipeline options"""
+    return _build_converter(tuple(sorted(pipeline_options_dict.items())))
+
+
+def _get_chunker(chunker_kwargs):
+    """Get (or build) the HybridChunker for these settings"""
+    return _build_chunker(tuple(sorted(chunker_kwargs.items())))
+
+
+DEFAULT_TOKENIZER = "bert-base-uncased"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tokenizer(name):
+    """
+    Load a fast (Rust-backed) HuggingFace tokenizer by name, or None if unavailable
+
+    With HF_OFFLINE / HF_HUB_OFFLINE set, only the local cache is used (no hub check).
+    """
+    local_only = bool(os.environ.get("HF_OFFLINE") or os.environ.get("HF_HUB_OFFLINE"))
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name, use_fast=True, local_files_only=local_only)
+    except Exception:
+        return None
+
+
+def _preload_tokenizer(name=DEFAULT_TOKENIZER):
+    """Load the tokenizer up front"""
+    _load_tokenizer(name)
+
+
+# Shared semaphore bounding concurrent GPU conversions in pool workers (None = no limit)
+_GPU_SLOT = None
+
+
+def _init_pool_worker(tokenizer_name, progress_queue, gpu_slot=None):
+    """Pool worker initializer: relay progress to the parent, keep the GPU slot, load the tokenizer"""
+    global _GPU_SLOT
+    # Ctrl-C reaches the whole process group; the parent's stop handler
+    # decides what happens, instead of a KeyboardInterrupt from each worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _emitter.queue = progress_queue
+    _GPU_SLOT = gpu_slot
+    _preload_tokenizer(tokenizer_name)
+
+
+def _get_hf_tokenizer(chunker, name):
+    """
+    Return the HuggingFace tokenizer the chunker measures its token budget with
+
+    Depending on the docling-core version it lives on chunker.tokenizer (a
+    wrapper exposing get_tokenizer()) or on the private chunker._tokenizer.
+    Falls back to loading `name` directly.
+    """
+    tokenizer = getattr(chunker, "tokenizer", None)
+    if hasattr(tokenizer, "get_tokenizer"):
+        tokenizer = tokenizer.get_tokenizer()
+    if not callable(tokenizer):
+        tokenizer = getattr(chunker, "_tokenizer", None)
+    if not callable(tokenizer):
+        tokenizer = _load_tokenizer(name)
+    return tokenizer
+
+
+def _count_tokens(tokenizer, texts):
+    """Count tokens for a batch of texts with a single tokenizer call"""
+    if not texts:
+        return []
+    if tokenizer is None:
+        # Rough estimate: whitespace-separated words, counted without splitting
+        return [text.count(" ") + text.count("\n") + 1 if text else 0 for text in texts]
+    encoded = tokenizer(texts, add_special_tokens=False, return_length=True, padding=False, verbose=False)
+    return list(encoded["length"])
+
+
+def _doc_item_metadata(doc_items, lean_metadata):
+    """Metadata fields describing the doc items a chunk was built from"""
+    if lean_metadata:
+        # References are enough to locate items; str(item) dumps
+        # whole tables/figures and can be megabytes per chunk
+        return {
+            "doc_items": [getattr(item, "self_ref", None) for item in doc_items],
+            "pages": sorted({
+                prov.page_no
+                for item in doc_items
+                for prov in getattr(item, "prov", None) or ()
+            })
+        }
+    return {"doc_items": list(map(str, doc_items))}
+
+
+def _chunk_record_builder(first_chunk, lean_metadata, source, chunk_part):
     """
-    progress_file = get_progress_file_path(output_file)
-    progress_data = {
-        "output_file": output_file,
-        "completed_chunks": completed_chunks,
-        "current_file_idx": current_file_idx,
-        "total_files": total_files,
-        "config": config,
-        "timestamp": time.time()
+    Return (get_text, get_metadata) functions for the chunks of one document part
+
+    The chunker yields one chunk type per run, so the attributes are probed
+    once on the first chunk instead of with hasattr() for every chunk. source
+    and chunk_part are the same for all chunks of a part and are bound here,
+    so get_metadata(chunk) only looks up the per-chunk fields.
+    """
+    get_text = operator.attrgetter("text") if hasattr(first_chunk, "text") else str
+
+    meta = getattr(first_chunk, "meta", None)
+    has_items = hasattr(meta, "doc_items")
+    has_headings = hasattr(meta, "headings")
+    get_items = operator.attrgetter("meta.doc_items")
+    get_headings = operator.attrgetter("meta.headings")
+
+    if has_items and has_headings:
+        def get_metadata(chunk):
+            return {"source": source, "chunk_part": chunk_part,
+                    **_doc_item_metadata(get_items(chunk), lean_metadata),
+                    "headings": get_headings(chunk)}
+    elif has_items:
+        def get_metadata(chunk):
+            return {"source": source, "chunk_part": chunk_part,
+                    **_doc_item_metadata(get_items(chunk), lean_metadata)}
+    elif has_headings:
+        def get_metadata(chunk):
+            return {"source": source, "chunk_part": chunk_part, "headings": get_headings(chunk)}
+    else:
+        template = {"source": source, "chunk_part": chunk_part}
+
+        def get_metadata(chunk):
+            return template.copy()
+
+    return get_text, get_metadata
+
+
+# Chunks of already converted documents are cached by content + settings.
+# Bump CACHE_VERSION whenever the chunk format changes.
+CACHE_VERSION = 3
+CACHE_DIR = Path(os.environ.get("RAGY_CACHE_DIR", Path.home() / ".cache" / "ragy")) / "docling"
+
+# Options that only affect speed, never the resulting chunks
+PERF_ONLY_OPTIONS = ("doc_batch_size", "page_batch_size", "enable_torch_compile")
+
+
+def _fingerprint_options(pipeline_options_dict, chunker_kwargs, lean_metadata):
+    """Settings that shape a document's chunks (and so belong in its fingerprint)"""
+    return {
+        **{k: v for k, v in pipeline_options_dict.items() if k not in PERF_ONLY_OPTIONS},
+        **chunker_kwargs,
+        "lean_metadata": lean_metadata
     }
-    try:
-        with open(progress_file, 'w') as f:
-            json.dump(progress_data, f, indent=2)
-    except Exception as e:
-        print(json.dumps({"error": f"Failed to save progress: {str(e)}"}), file=sys.stderr, flush=True)
 
 
-def load_progress(output_file):
+def _doc_fingerprint(path, options):
     """
-    Load progress from disk if resuming
+    Fingerprint a document's bytes together with the settings that shape its chunks
+
+    Args:
+        path: Path to the document
+        options: Dict of pipeline/chunker settings (changing any of them invalidates the cache)
 
     Returns:
-        Progress data dict or None if no progress exists
+        Hex digest string
     """
-    progress_file = get_progress_file_path(output_file)
-    if not progress_file.exists():
-        return None
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):  # 1 MiB at a time
+            digest.update(block)
+    digest.update(json.dumps({"version": CACHE_VERSION, **options}, sort_keys=True).encode())
+    return digest.hexdigest()
 
-    try:
-        with open(progress_file, 'r') as f:
-            progress_data = json.load(f)
-
-        # Check if progress is recent (within 7 days)
-        age_days = (time.time() - progress_data.get("timestamp", 0)) / 86400
-        if age_days > 7:
-            print(json.dumps({"info": "Progress file too old (>7 days), starting fresh"}), file=sys.stderr, flush=True)
-            return None
 
-        return progress_data
+def load_cached_chunks(fingerprint):
+    """Load cached chunks for a fingerprint, or None on a cache miss"""
+    cache_file = CACHE_DIR / f"{fingerprint}.json"
+    try:
+        with open(cache_file, 'rb') as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        return None
     except Exception as e:
-        print(json.dumps({"error": f"Failed to load progress: {str(e)}"}), file=sys.stderr, flush=True)
+        _emitter.emit({"warning": f"Ignoring unreadable cache entry {cache_file.name}: {str(e)}"})
         return None
 
 
-def clear_progress(output_file):
-    """Clear progress file after successful completion"""
-    progress_file = get_progress_file_path(output_file)
+def save_cached_chunks(fingerprint, chunks):
+    """Atomically store chunks for a fingerprint (a crash never leaves a partial entry)"""
+    cache_file = CACHE_DIR / f"{fingerprint}.json"
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
     try:
-        if progress_file.exists():
-            progress_file.unlink()
-    except:
-        pass
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            f.write(_dumpb(chunks))
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        _emitter.emit({"warning": f"Failed to cache chunks: {str(e)}"})
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
 
 
-def split_pdf(pdf_path, pages_per_chunk=100):
+def _process_one_file(doc_path, idx, total_files, pipeline_options_dict, chunker_kwargs,
+                      completed_chunk_paths=frozenset(), device_type='unknown', lean_metadata=True,
+                      on_part_done=None, fingerprint=None):
     """
-    Split a large PDF into smaller chunks for memory-efficient processing
+    Convert and chunk a single document
+
+    Runs either in the main process or in a ProcessPoolExecutor worker, so it
+    must stay a top-level function and only take picklable arguments.
+
+    Conversion and chunking only overlap between the parts of a split PDF
+    (split-part overlap): a file converted in one piece - most inputs with
+    the default settings - is converted, then chunked. Overlap across files
+    comes from running several workers (num_workers).
 
     Args:
-        pdf_path: Path to the PDF file
-        pages_per_chunk: Number of pages per chunk (default 100)
+        doc_path: Path to the document
+        idx: 1-based index of the document (for progress messages)
+        total_files: Total number of documents in this run
+        pipeline_options_dict: Plain dict used to rebuild PdfPipelineOptions
+        chunker_kwargs: Keyword arguments for HybridChunker
+        completed_chunk_paths: Parts already saved by a previous session (skipped)
+        device_type: Detected accelerator, shown in heartbeat messages
+        lean_metadata: Store doc item references and page numbers instead of full item dumps
+        on_part_done: Optional callback(chunk_path, chunk_idx, total_chunks, chunks)
+            called as soon as a part is chunked. Without it (pool workers), parts
+            are returned with each chunk already serialized to a JSON line, which
+            is smaller to hold and cheaper to send to the parent than the dicts.
+        fingerprint: Precomputed content fingerprint (computed here if omitted)
 
     Returns:
-        List of paths to chunk files
+        Tuple (chunks_list, filename, error) where chunks_list holds the
+        (chunk_path, chunk_idx, total_chunks, chunks) parts not already passed
+        to on_part_done, and error is None on success
     """
+    doc_path = Path(doc_path)
+    source_name = doc_path.name  # Used in every progress message and chunk record
+    chunks_list = []
+
+    def deliver(chunk_path, chunk_idx, total_chunks, pdf_chunk_results):
+        if on_part_done is not None:
+            on_part_done(chunk_path, chunk_idx, total_chunks, pdf_chunk_results)
+        else:
+            chunks_list.append((chunk_path, chunk_idx, total_chunks, [_dumpb_line(c) for c in pdf_chunk_results]))
+
     try:
-        with open(pdf_path, 'rb') as f:
-            pdf = pypdf.PdfReader(f)
-            total_pages = len(pdf.pages)
+        # Reuse chunks from an earlier run of the same file with the same settings,
+        # unless a previous session already saved some of its split parts
+        partly_done = any(p == str(doc_path) or is_split_part(p, doc_path) for p in completed_chunk_paths)
+        if not partly_done:
+            try:
+                if fingerprint is None:
+                    fingerprint = _doc_fingerprint(
+                        doc_path, _fingerprint_options(pipeline_options_dict, chunker_kwargs, lean_metadata)
+                    )
+            except OSError:
+                fingerprint = None
+        else:
+            fingerprint = None
+
+        cached_chunks = load_cached_chunks(fingerprint) if fingerprint else None
+        if cached_chunks is not None:
+            for chunk in cached_chunks:
+                chunk["metadata"]["source"] = source_name
+            _emitter.emit({
+                "info": f"Using cached chunks for {source_name} - skipping conversion",
+                "fingerprint": fingerprint,
+                "chunks": len(cached_chunks)
+            })
+            deliver(str(doc_path), 1, 1, cached_chunks)
+            return chunks_list, source_name, None
+
+        # Chunks of every part, kept for the cache once the whole file is done
+        file_chunks = []
+        skipped_parts = False
+
+        # Get page count for PDFs and check if splitting is needed
+        page_count = None
+        pdf_chunks = [(str(doc_path), None)]  # Default: process whole file
+        file_options = pipeline_options_dict
+
+        if doc_path.suffix.lower() == '.pdf':
+            page_count = get_pdf_page_count(str(doc_path))
+            pdf_chunks = [(str(doc_path), page_count)]
+
+            # Only OCR PDFs that don't already have machine-readable text, and
+            # only run the image models on PDFs that contain images
+            file_options, triage = triage_file_options(doc_path, pipeline_options_dict)
+            if triage is not None:
+                _emitter.emit({
+                    "info": f"Triage for {source_name}: "
+                            f"{'scanned' if triage['scanned'] else 'text layer'}, {'images' if triage['has_images'] else 'no images'}",
+                    "ocr": file_options["enable_ocr"],
+                    "picture_models": file_options["enable_picture_classification"] or file_options["enable_picture_description"]
+                })
+
+            # Split large PDFs (>200 pages) if AI descriptions are enabled
+            # This prevents out-of-memory issues on large documents
+            if page_count and page_count > 200 and file_options["enable_picture_description"]:
+                pdf_chunks = split_pdf(str(doc_path), pages_per_chunk=100)
+
+        total_chunks = len(pdf_chunks)
+
+        # One converter per triage outcome, so files can switch without rebuilding
+        converter = _get_converter(file_options)
+        chunker = _get_chunker(chunker_kwargs)
+        tokenizer = _get_hf_tokenizer(chunker, chunker_kwargs["tokenizer"])
+        autocast_dtype = _autocast_dtype(device_type, file_options.get("enable_mixed_precision", True))
+
+        # Count enabled enrichments for better time estimation
+        enrichments_count = sum([
+            file_options["enable_formula"],
+            file_options["enable_picture_classification"],
+            file_options["enable_picture_description"],
+            file_options["enable_code_enrichment"],
+            file_options["enable_ocr"],
+            file_options["enable_table_structure"]
+        ])
+
+        # Split-part overlap: convert parts on a background thread while this
+        # thread chunks the previous one (an unsplit file is a single part, so
+        # there is nothing to overlap). The queue holds at most one finished DoclingDocument,
+        # so at most three parts are in memory at once (large PDFs are split
+        # precisely to keep memory down).
+        convert_queue = queue.Queue(maxsize=1)
+        abort = threading.Event()
+
+        def put(item):
+            while not abort.is_set():
+                try:
+                    convert_queue.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
 
-            if total_pages <= pages_per_chunk:
-                # No need to split
-                return [pdf_path]
+        current_heartbeat = None
 
-            # Create temp directory for chunks
-            pdf_name = Path(pdf_path).stem
-            temp_dir = Path(pdf_path).parent / f".chunks_{pdf_name}"
-            temp_dir.mkdir(exist_ok=True)
+        def convert_parts():
+            nonlocal skipped_parts, current_heartbeat
+            try:
+                # Skip already completed chunks
+                parts_to_convert = []
+                for chunk_idx, (part, chunk_page_count) in enumerate(pdf_chunks, 1):
+                    chunk_path = get_part_key(part, doc_path)
+                    if chunk_path in completed_chunk_paths:
+                        skipped_parts = True
+                        _emitter.emit({
+                            "info": f"Skipping already completed chunk: {Path(chunk_path).name}"
+                        })
+                    else:
+                        parts_to_convert.append((chunk_idx, chunk_path, part, chunk_page_count))
+
+                # convert_all lets Docling's own doc/page batching engage; it yields
+                # results lazily, in order, so progress stays per part
+                results = converter.convert_all([part for _, _, part, _ in parts_to_convert])
+
+                # Process each chunk (will be 1 chunk for small PDFs or non-PDFs)
+                for chunk_idx, chunk_path, part, chunk_page_count in parts_to_convert:
+                    # Check for stop signal before starting each chunk
+                    if STOP_EVENT.is_set() or abort.is_set():
+                        skipped_parts = True
+                        break
+
+                    # Send initial progress update for this chunk
+                    initial_progress = {
+                        "type": "progress",
+                        "current": idx,
+                        "total": total_files,
+                        "file": source_name,
+                        "status": "converting",
+                        "total_pages": page_count or 0,
+                        "current_chunk": chunk_idx,
+                        "total_chunks": total_chunks,
+                        "chunk_pages": chunk_page_count or 0,
+                        "ocr": file_options["enable_ocr"],
+                        "picture_models": file_options["enable_picture_classification"] or file_options["enable_picture_description"],
+                        "elapsed": 0
+                    }
+                    _emitter.emit(initial_progress, force=True)  # Don't hold it back during the long convert call
 
-            chunk_paths = []
-            num_chunks = (total_pages + pages_per_chunk - 1) // pages_per_chunk
+                    # Heartbeats for this conversion are sent by the waiting chunking thread
+                    current_heartbeat = ConversionHeartbeat(
+                        idx, total_files, f"{source_name} (chunk {chunk_idx}/{total_chunks})",
+                        chunk_page_count or 0, enrichments_count, device_type
+                    )
 
-            print(json.dumps({
-                "info": f"Splitting {total_pages}-page PDF into {num_chunks} chunks of ~{pages_per_chunk} pages",
-                "reason": "Large PDF with AI descriptions - processing in chunks to prevent out-of-memory"
-            }), file=sys.stderr, flush=True)
+                    try:
+                        # Convert document chunk (blackbox operation). The lazy generator
+                        # converts on this thread, so models Docling calls inline run
+                        # under the inference context; work it hands to its own threads doesn't
+                        with _GPU_SLOT or contextlib.nullcontext(), _inference_context(device_type, autocast_dtype):
+                            result = next(results)
+                        doc = result.document
+                    finally:
+                        current_heartbeat = None
 
-            for chunk_idx in range(num_chunks):
-                start_page = chunk_idx * pages_per_chunk
-                end_page = min(start_page + pages_per_chunk, total_pages)
+                    # Send completion for converting phase of this chunk
+                    converted_progress = {
+                        "type": "progress",
+                        "current": idx,
+                        "total": total_files,
+                        "file": source_name,
+                        "status": "converted",
+                        "current_chunk": chunk_idx,
+                        "total_chunks": total_chunks,
+                        "total_pages": page_count or 0
+                    }
+                    _emitter.emit(converted_progress, force=True)
 
-                # Create writer for this chunk
-                writer = pypdf.PdfWriter()
+                    put((chunk_idx, chunk_path, doc))
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
 
-                # Add pages to this chunk
-                for page_num in range(start_page, end_page):
-                    writer.add_page(pdf.pages[page_num])
+        converter_thread = threading.Thread(target=convert_parts, daemon=True)
+        converter_thread.start()
 
-                # Save chunk
-                chunk_path = temp_dir / f"{pdf_name}_chunk{chunk_idx+1:03d}_p{start_page+1}-{end_page}.pdf"
-                with open(chunk_path, 'wb') as chunk_file:
-                    writer.write(chunk_file)
+        try:
+            while True:
+                try:
+                    item = convert_queue.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    # Still converting - send a heartbeat to show we're working
+                    heartbeat = current_heartbeat
+                    if heartbeat is not None:
+                        _emitter.emit(heartbeat.payload())
+                    continue
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                chunk_idx, chunk_path, doc = item
+
+                # Chunk this PDF chunk, turning chunks into records a batch at a
+                # time so the DocChunk objects don't pile up for the whole part
+                chunk_part = f"{chunk_idx}/{total_chunks}" if total_chunks > 1 else None
+                chunk_iter = iter(chunker.chunk(doc))
+                get_text = get_metadata = None
+                pdf_chunk_results = []
+
+                while True:
+                    batch = list(itertools.islice(chunk_iter, CHUNK_BATCH_SIZE))
+                    if not batch:
+                        break
+                    if get_text is None:
+                        get_text, get_metadata = _chunk_record_builder(batch[0], lean_metadata, source_name, chunk_part)
+                        # Chunks that carry the count the chunker budgeted
+                        # max_tokens with don't need tokenizing a second time
+                        has_num_tokens = isinstance(getattr(batch[0], "num_tokens", None), int)
+
+                    # Real token counts from the chunker's tokenizer, in one call per batch
+                    chunk_texts = list(map(get_text, batch))
+                    if has_num_tokens:
+                        token_counts = [chunk.num_tokens for chunk in batch]
+                    else:
+                        token_counts = _count_tokens(tokenizer, chunk_texts)
+
+                    pdf_chunk_results.extend(
+                        {
+                            "text": chunk_text,
+                            "metadata": get_metadata(chunk),
+                            "tokens": tokens
+                        }
+                        for chunk, chunk_text, tokens in zip(batch, chunk_texts, token_counts)
+                    )
 
-                chunk_paths.append(str(chunk_path))
+                    # Send progress update (once per batch is plenty for the UI)
+                    chunking_progress = {
+                        "type": "progress",
+                        "current": idx,
+                        "total": total_files,
+                        "file": source_name,
+                        "status": "chunking",
+                        "current_chunk": chunk_idx,
+                        "total_chunks": total_chunks,
+                        "chunks_so_far": len(pdf_chunk_results)
+                    }
+                    _emitter.emit(chunking_progress)
 
-                print(json.dumps({
-                    "info": f"Created chunk {chunk_idx+1}/{num_chunks}: pages {start_page+1}-{end_page}"
-                }), file=sys.stderr, flush=True)
+                file_chunks.extend(pdf_chunk_results)
+                deliver(chunk_path, chunk_idx, total_chunks, pdf_chunk_results)
+        finally:
+            # Lets the converter thread exit early if chunking failed
+            abort.set()
 
-            return chunk_paths
+        if fingerprint and not skipped_parts:
+            save_cached_chunks(fingerprint, file_chunks)
 
     except Exception as e:
-        print(json.dumps({
-            "error": f"Failed to split PDF: {str(e)}"
-        }), file=sys.stderr, flush=True)
-        return [pdf_path]  # Fall back to processing whole file
+        return chunks_list, source_name, str(e)
+    finally:
+        _emitter.flush()
 
+    return chunks_list, source_name, None
 
-def append_chunks_to_file(output_file, chunks, is_first_write=False):
-    """
-    Append chunks to the output file incrementally
 
-    Args:
-        output_file: Path to JSON output file
-        chunks: List of chunks to append
-        is_first_write: True if this is the first write (creates file), False to append
-    """
-    try:
-        if is_first_write:
-            # First write: create file with metadata and start chunks array
-            output_data = {
-                "method": "docling-hybrid",
-                "chunks": chunks,
-                "total_chunks": len(chunks)
-            }
-            with open(output_file, 'w') as f:
-                json.dump(output_data, f, indent=2)
-        else:
-            # Subsequent writes: read existing, append chunks, write back
-            with open(output_file, 'r') as f:
-                output_data = json.load(f)
+# Supported formats by Docling (lowercase; matched case-insensitively)
+SUPPORTED_EXTENSIONS = frozenset({
+    # Documents
+    '.pdf', '.docx', '.doc',
+    # Spreadsheets
+    '.xlsx', '.xls',
+    # Presentations
+    '.pptx', '.ppt',
+    # Text files
+    '.md', '.txt', '.rst',
+    # Images (for OCR)
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif',
+    # HTML
+    '.html', '.htm'
+})
 
-            output_data["chunks"].extend(chunks)
-            output_data["total_chunks"] = len(output_data["chunks"])
 
-            with open(output_file, 'w') as f:
-                json.dump(output_data, f, indent=2)
+# Seconds between stop checks while waiting on pool workers
+STOP_POLL_INTERVAL = 0.5
 
-        return True
-    except Exception as e:
-        print(json.dumps({"error": f"Failed to save chunks: {str(e)}"}), file=sys.stderr, flush=True)
-        return False
+
+# Threads each Docling conversion keeps busy; bounds the automatic worker count
+THREADS_PER_WORKER = 4
+
+
+def _terminate_pool(executor):
+    """
+    Shut a ProcessPoolExecutor down now, killing workers mid-conversion
+
+    shutdown(wait=False) alone returns right away, but concurrent.futures'
+    exit hook then joins the workers, so the process would only exit once
+    every in-flight conversion had finished.
+    """
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def _resolve_num_workers(num_workers, device, num_jobs):
+    """
+    Number of documents to convert in parallel
+
+    num_workers <= 0 picks one worker per THREADS_PER_WORKER physical cores.
+    CUDA always runs serially: the models aren't safe to share across worker
+    processes and one process already keeps the GPU busy. MPS workers run in
+    parallel, but their conversions take turns on the GPU (see _GPU_SLOT).
+    """
+    if device.startswith('cuda'):
+        return 1
+    if num_workers <= 0:
+        physical_cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+        num_workers = max(1, physical_cores // THREADS_PER_WORKER)
+    return max(1, min(num_workers, num_jobs))
 
 
-def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, enable_formula=True, enable_picture_classification=False, enable_picture_description=False, enable_code_enrichment=False, enable_ocr=True, enable_table_structure=True, picture_description_max_tokens=100, resume=False, vision_batch_size=4, processing_batch_size=4):
+def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, enable_formula=True, enable_picture_classification=False, enable_picture_description=False, enable_code_enrichment=False, enable_ocr=True, enable_table_structure=True, picture_description_max_tokens=100, resume=False, vision_batch_size=4, processing_batch_size=4, num_workers=1, lean_metadata=True, doc_batch_size=8, page_batch_size=16, enable_vlm_quantization=False, enable_torch_compile=False, enable_mixed_precision=True, save_every_n_chunks=COMMIT_MAX_CHUNKS, save_every_secs=COMMIT_MAX_SECS, file_timeout=0):
     """
     Process documents in input_dir and save chunks to output_file INCREMENTALLY
 
     Args:
         input_dir: Directory containing documents to process
-        output_file: Path to save JSON output (saved after each PDF chunk)
+        output_file: Path to save JSON output (chunks are streamed to a JSON-Lines file after each PDF chunk)
         max_tokens: Maximum tokens per chunk
         merge_peers: Whether to merge consecutive chunks with same headers
         enable_formula: Enable LaTeX formula extraction (recommended for technical docs)
@@ -368,108 +1926,48 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
         resume: If True, resume from saved progress
         vision_batch_size: Batch size for vision model (1-32, default 4, higher=faster but more VRAM)
         processing_batch_size: Batch size for OCR/layout/table (1-32, default 4, higher=faster but more RAM)
+        num_workers: Number of documents converted in parallel (default 1, 0 = auto; each worker
+            loads its own models; always 1 on CUDA)
+        lean_metadata: Store doc item references (self_ref) and page numbers instead of full str() dumps
+        doc_batch_size: Documents Docling converts per batch (higher = better utilization for many small files)
+        page_batch_size: Pages Docling pushes through the models per batch (higher = faster but more RAM)
+        enable_vlm_quantization: Run the picture description model with int8 weights (CPU only, default off)
+        enable_torch_compile: Compile the layout/table/VLM models with torch.compile (default off)
+        enable_mixed_precision: Autocast models to FP16 (CUDA) / BF16 (MPS); CPU always runs FP32 (default on)
+        save_every_n_chunks: Commit saved chunks and progress once this many are pending (default 64)
+        save_every_secs: ...or once this many seconds passed since the last commit (default 5)
+        file_timeout: Seconds after which a file still converting is reported as failed and skipped (default 0 = no limit).
+            Conversions then run in worker processes, even with num_workers=1, so an overrunning
+            one can be killed along with its process; its worker is replaced, reloading the models.
+            Files are saved whole rather than part by part.
     """
-    global STOP_REQUESTED
-
-    # Register signal handler for graceful stop
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Register signal handler for graceful stop (restored on return, so an
+    # idle --daemon process can still be interrupted or terminated)
+    previous_handlers = {sig: signal.signal(sig, signal_handler) for sig in (signal.SIGINT, signal.SIGTERM)}
 
+    # Set up once the output is opened; the finally block checks for None
+    sink = progress_log = commit_parts = None
     try:
-        # Initialize converter with optimized settings for M1/M2/M3 Macs
-        from docling.datamodel.pipeline_options import (
-            PdfPipelineOptions,
-            AcceleratorOptions,
-            PictureDescriptionVlmOptions
-        )
-        from docling.datamodel.base_models import InputFormat
-        from docling.document_converter import PdfFormatOption
-
-        # Configure accelerator with auto-detection for cross-platform compatibility
-        # Will automatically select: CUDA (NVIDIA), MPS (Apple Silicon), or CPU
-        accelerator_options = AcceleratorOptions(
-            device='auto',  # Auto-detect best available device
-            num_threads=8   # Optimize for modern CPUs (adjust based on cores)
-        )
-
-        # CRITICAL: Use configurable batch sizes to balance speed vs memory
-        # Large batch sizes = faster for small docs, but cause OOM on large docs
-        # Docling loads entire batches into RAM simultaneously
-        pipeline_options = PdfPipelineOptions(
-            accelerator_options=accelerator_options,
-            # User-configurable batch sizes for performance tuning
-            ocr_batch_size=processing_batch_size,       # User-defined (default: 4)
-            layout_batch_size=processing_batch_size,    # User-defined (default: 4)
-            table_batch_size=processing_batch_size      # User-defined (default: 4)
-        )
-        
-        # Enable formula enrichment for mathematical equations
-        if enable_formula:
-            pipeline_options.do_formula_enrichment = True
-            print(json.dumps({"info": "Formula enrichment enabled - will extract LaTeX from equations"}), file=sys.stderr, flush=True)
-        
-        # Enable picture classification (identifies chart types, diagrams, etc.)
-        if enable_picture_classification:
-            pipeline_options.do_picture_classification = True
-            print(json.dumps({"info": "Picture classification enabled"}), file=sys.stderr, flush=True)
-        
-        # Enable picture description (generates captions using vision models)
-        if enable_picture_description:
-            # Use lightweight SmolVLM model with optimized batch size for M3 GPU
-            try:
-                from docling.datamodel.pipeline_options import smolvlm_picture_description
-
-                # CRITICAL: Use configurable batch size to balance speed vs memory
-                # Large batches load many images into RAM/VRAM simultaneously
-                # For large documents (100+ pages), large batch sizes can cause OOM
-                # Default batch_size is 8, we use user-defined (default 4) for customization
-                optimized_vlm_config = PictureDescriptionVlmOptions(
-                    batch_size=vision_batch_size,   # User-defined (default: 4)
-                    scale=2,  # Keep default
-                    picture_area_threshold=0.05,  # Keep default
-                    repo_id='HuggingFaceTB/SmolVLM-256M-Instruct',
-                    prompt='Describe this image in a few sentences.',
-                    generation_config={
-                        'max_new_tokens': picture_description_max_tokens,  # User-configurable
-                        'do_sample': False
-                    }
-                )
+        # Plain dict so it can be shipped to worker processes
+        pipeline_options_dict = {
+            "enable_formula": enable_formula,
+            "enable_picture_classification": enable_picture_classification,
+            "enable_picture_description": enable_picture_description,
+            "enable_code_enrichment": enable_code_enrichment,
+            "enable_ocr": enable_ocr,
+            "enable_table_structure": enable_table_structure,
+            "picture_description_max_tokens": picture_description_max_tokens,
+            "vision_batch_size": vision_batch_size,
+            "processing_batch_size": processing_batch_size,
+            "doc_batch_size": doc_batch_size,
+            "page_batch_size": page_batch_size,
+            "enable_vlm_quantization": enable_vlm_quantization,
+            "enable_torch_compile": enable_torch_compile,
+            "enable_mixed_precision": enable_mixed_precision
+        }
 
-                pipeline_options.do_picture_description = True
-                pipeline_options.picture_description_options = optimized_vlm_config
-                print(json.dumps({
-                    "info": "Picture description enabled using SmolVLM (256M model)",
-                    "batch_size": vision_batch_size,
-                    "max_tokens_per_image": picture_description_max_tokens,
-                    "note": f"Batch size {vision_batch_size} - balance speed vs memory usage"
-                }), file=sys.stderr, flush=True)
-            except ImportError:
-                print(json.dumps({"warning": "Picture description requested but SmolVLM not available"}), file=sys.stderr, flush=True)
-        
-        # Enable code enrichment for code blocks
-        if enable_code_enrichment:
-            pipeline_options.do_code_enrichment = True
-            print(json.dumps({"info": "Code enrichment enabled - will extract and format code blocks"}), file=sys.stderr, flush=True)
-        
-        # Control OCR (text recognition for scanned documents)
-        pipeline_options.do_ocr = enable_ocr
-        if enable_ocr:
-            print(json.dumps({"info": "OCR enabled - will extract text from scanned images"}), file=sys.stderr, flush=True)
-        else:
-            print(json.dumps({"info": "OCR disabled - will only extract native text"}), file=sys.stderr, flush=True)
-        
-        # Control table structure extraction
-        pipeline_options.do_table_structure = enable_table_structure
-        if enable_table_structure:
-            print(json.dumps({"info": "Table structure enabled - will preserve table layouts"}), file=sys.stderr, flush=True)
-        else:
-            print(json.dumps({"info": "Table structure disabled - tables will be treated as plain text"}), file=sys.stderr, flush=True)
-        
-        converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
-            }
-        )
+        # Build once up front to validate the options and log enabled enrichments
+        pipeline_options = _build_pipeline_options(pipeline_options_dict, verbose=True)
 
         # Detect and log actual hardware acceleration being used
         import torch
@@ -484,8 +1982,14 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
                 "ocr": pipeline_options.ocr_batch_size,
                 "layout": pipeline_options.layout_batch_size,
                 "table": pipeline_options.table_batch_size,
-                "vision": actual_vision_batch
+                "vision": actual_vision_batch,
+                "doc": doc_batch_size,
+                "page": page_batch_size
             },
+            "num_workers": num_workers,
+            "vlm_quantization": "int8 (CPU)" if enable_picture_description and enable_vlm_quantization else None,
+            "torch_compile": enable_torch_compile,
+            "dtype": _autocast_dtype(detected_device, enable_mixed_precision) or "float32",
             "user_configured": True,
             "note": f"Using user-configured batch sizes (processing: {processing_batch_size}, vision: {actual_vision_batch})"
         }
@@ -501,41 +2005,28 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
             device_info["hardware"] = "CPU only"
             device_info["warning"] = "No GPU acceleration - processing will be slower"
 
-        print(json.dumps({"type": "hardware_info", "data": device_info}), file=sys.stderr, flush=True)
+        _emitter.emit({"type": "hardware_info", "data": device_info}, force=True)
 
-        # Initialize chunker
-        chunker = HybridChunker(
-            tokenizer="bert-base-uncased",
-            max_tokens=max_tokens,
-            merge_peers=merge_peers
-        )
+        # Chunker settings (the chunker itself is built lazily per process)
+        chunker_kwargs = {
+            "tokenizer": DEFAULT_TOKENIZER,
+            "max_tokens": max_tokens,
+            "merge_peers": merge_peers
+        }
         
-        all_chunks = []
         processed_files = []
+        total_chunks_count = 0  # Chunks live on disk, only the count is kept in memory
         
-        # Find all supported documents
-        input_path = Path(input_dir)
-        document_files = []
-        
-        # Supported formats by Docling
-        supported_extensions = [
-            # Documents
-            '.pdf', '.docx', '.doc',
-            # Spreadsheets
-            '.xlsx', '.xls',
-            # Presentations
-            '.pptx', '.ppt',
-            # Text files
-            '.md', '.txt', '.rst',
-            # Images (for OCR)
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif',
-            # HTML
-            '.html', '.htm'
-        ]
-        
-        for ext in supported_extensions:
-            document_files.extend(input_path.glob(f'*{ext}'))
-            document_files.extend(input_path.glob(f'*{ext.upper()}'))
+        # One directory scan with a case-insensitive set lookup, sorted so file
+        # indices (and with them resume points) are the same on every run
+        try:
+            with os.scandir(input_dir) as entries:
+                document_files = sorted(
+                    Path(entry.path) for entry in entries
+                    if entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS
+                )
+        except FileNotFoundError:
+            document_files = []
         
         if not document_files:
             return {
@@ -546,19 +2037,53 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
         # Check for existing progress and resume if requested
         completed_chunk_paths = []
         start_file_idx = 1
+        chunks_file_size = 0
 
         if resume:
             progress_data = load_progress(output_file)
             if progress_data:
                 completed_chunk_paths = progress_data.get("completed_chunks", [])
                 start_file_idx = progress_data.get("current_file_idx", 1)
+                total_chunks_count = progress_data.get("total_chunks", 0)
+                chunks_file_size = progress_data.get("chunks_file_size", 0)
 
-                print(json.dumps({
+                _emitter.emit({
                     "info": f"Resuming from previous session - {len(completed_chunk_paths)} chunks already completed",
                     "resuming_from_file": start_file_idx
-                }), file=sys.stderr, flush=True)
+                })
+            else:
+                _emitter.emit({"info": "No previous progress found, starting fresh"})
+
+        # Start a fresh chunk file, or cut it back to the last saved part
+        sink = SinkWriter(output_file, chunks_file_size, max_chunks=save_every_n_chunks, max_secs=save_every_secs)
+        progress_log = ProgressLog(output_file, completed_chunk_paths)
+
+        # Parts appended to the sink since the last commit: (chunk_path, chunk count)
+        uncommitted_parts = []
+
+        def commit_parts():
+            nonlocal total_chunks_count, chunks_file_size
+            if not uncommitted_parts:
+                return
+
+            new_size = sink.commit()
+            if new_size is None:
+                # Nothing since the last commit made it to disk - forget those parts
+                del completed_chunk_paths[-len(uncommitted_parts):]
+                total_chunks_count -= sum(count for _, count in uncommitted_parts)
             else:
-                print(json.dumps({"info": "No previous progress found, starting fresh"}), file=sys.stderr, flush=True)
+                chunks_file_size = new_size
+                save_chunks_meta(output_file, total_chunks_count)
+
+                # Log the parts before the progress file counts them
+                progress_log.append([chunk_path for chunk_path, _ in uncommitted_parts])
+                save_state()
+            uncommitted_parts.clear()
+
+        def save_state():
+            """Save the progress file for resume"""
+            save_progress(output_file, len(completed_chunk_paths), min(pending_files, default=total_files), total_files,
+                          config, total_chunks_count, chunks_file_size)
 
         # Save configuration for resume
         config = {
@@ -570,216 +2095,156 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
             "enable_code_enrichment": enable_code_enrichment,
             "enable_ocr": enable_ocr,
             "enable_table_structure": enable_table_structure,
-            "picture_description_max_tokens": picture_description_max_tokens
+            "picture_description_max_tokens": picture_description_max_tokens,
+            "enable_vlm_quantization": enable_vlm_quantization
         }
 
-        # Process each document
         total_files = len(document_files)
-        for idx, doc_path in enumerate(document_files, 1):
-            # Check for stop signal
-            if STOP_REQUESTED:
-                print(json.dumps({
-                    "info": "Processing stopped by user - progress saved",
-                    "completed_parts": len(completed_chunk_paths),
-                    "can_resume": True
-                }), file=sys.stderr, flush=True)
-                return {
-                    "success": False,
-                    "error": "Stopped by user",
-                    "resumable": True,
-                    "completed_parts": len(completed_chunk_paths)
-                }
-
-            # Skip files before resume point
-            if idx < start_file_idx:
-                continue
-            try:
-                # Get page count for PDFs and check if splitting is needed
-                page_count = None
-                pdf_chunks = [str(doc_path)]  # Default: process whole file
-
-                if doc_path.suffix.lower() == '.pdf':
-                    page_count = get_pdf_page_count(str(doc_path))
-
-                    # Split large PDFs (>200 pages) if AI descriptions are enabled
-                    # This prevents out-of-memory issues on large documents
-                    if page_count and page_count > 200 and enable_picture_description:
-                        pdf_chunks = split_pdf(str(doc_path), pages_per_chunk=100)
-
-                total_chunks = len(pdf_chunks)
-
-                # Process each chunk (will be 1 chunk for small PDFs or non-PDFs)
-                for chunk_idx, chunk_path in enumerate(pdf_chunks, 1):
-                    # Check for stop signal before starting each chunk
-                    if STOP_REQUESTED:
-                        save_progress(output_file, completed_chunk_paths, idx, total_files, config)
-                        print(json.dumps({
-                            "info": "Processing stopped - progress saved",
-                            "completed_parts": len(completed_chunk_paths)
-                        }), file=sys.stderr, flush=True)
-                        return {
-                            "success": False,
-                            "error": "Stopped by user",
-                            "resumable": True,
-                            "completed_parts": len(completed_chunk_paths)
-                        }
-
-                    # Skip already completed chunks
-                    if chunk_path in completed_chunk_paths:
-                        print(json.dumps({
-                            "info": f"Skipping already completed chunk: {Path(chunk_path).name}"
-                        }), file=sys.stderr, flush=True)
-                        continue
-
-                    chunk_page_count = get_pdf_page_count(chunk_path) if chunk_path.endswith('.pdf') else page_count
-
-                    # Send initial progress update for this chunk
-                    initial_progress = {
-                        "type": "progress",
-                        "current": idx,
-                        "total": total_files,
-                        "file": doc_path.name,
-                        "status": "converting",
-                        "total_pages": page_count or 0,
-                        "current_chunk": chunk_idx,
-                        "total_chunks": total_chunks,
-                        "chunk_pages": chunk_page_count or 0,
-                        "elapsed": 0
-                    }
-                    print(json.dumps(initial_progress), file=sys.stderr, flush=True)
-                    sys.stderr.flush()
-
-                    # Count enabled enrichments for better time estimation
-                    enrichments_count = sum([
-                        enable_formula,
-                        enable_picture_classification,
-                        enable_picture_description,
-                        enable_code_enrichment,
-                        enable_ocr,
-                        enable_table_structure
-                    ])
-
-                    # Start heartbeat thread to show we're working
-                    heartbeat_thread = threading.Thread(
-                        target=send_conversion_heartbeat,
-                        args=(idx, total_files, f"{doc_path.name} (chunk {chunk_idx}/{total_chunks})",
-                              chunk_page_count or 0, 2, enrichments_count, detected_device),
-                        daemon=True
-                    )
-                    heartbeat_thread.do_run = True
-                    heartbeat_thread.start()
-
-                    try:
-                        # Convert document chunk (blackbox operation)
-                        result = converter.convert(chunk_path)
-                        doc = result.document
-                    finally:
-                        # Stop heartbeat
-                        heartbeat_thread.do_run = False
-                        heartbeat_thread.join(timeout=1)
-
-                    # Send completion for converting phase of this chunk
-                    converted_progress = {
-                        "type": "progress",
-                        "current": idx,
-                        "total": total_files,
-                        "file": doc_path.name,
-                        "status": "converted",
-                        "current_chunk": chunk_idx,
-                        "total_chunks": total_chunks,
-                        "total_pages": page_count or 0
-                    }
-                    print(json.dumps(converted_progress), file=sys.stderr, flush=True)
-                    sys.stderr.flush()
-
-                    # Chunk this PDF chunk and collect results
-                    chunk_count = 0
-                    pdf_chunk_results = []
-
-                    for chunk in chunker.chunk(doc):
-                        chunk_count += 1
-
-                        # Send progress update
-                        chunking_progress = {
-                            "type": "progress",
-                            "current": idx,
-                            "total": total_files,
-                            "file": doc_path.name,
-                            "status": "chunking",
-                            "current_chunk": chunk_idx,
-                            "total_chunks": total_chunks,
-                            "chunks_so_far": chunk_count
-                        }
-                        print(json.dumps(chunking_progress), file=sys.stderr, flush=True)
-                        sys.stderr.flush()
 
-                        # Convert chunk to our format
-                        chunk_text = chunk.text if hasattr(chunk, 'text') else str(chunk)
-
-                        # Extract metadata
-                        metadata = {
-                            "source": doc_path.name,
-                            "chunk_part": f"{chunk_idx}/{total_chunks}" if total_chunks > 1 else None
-                        }
-
-                        # Try to get additional metadata if available
-                        if hasattr(chunk, 'meta'):
-                            if hasattr(chunk.meta, 'doc_items'):
-                                metadata["doc_items"] = [str(item) for item in chunk.meta.doc_items]
-                            if hasattr(chunk.meta, 'headings'):
-                                metadata["headings"] = chunk.meta.headings
+        # Skip files before resume point
+        jobs = [(idx, doc_path) for idx, doc_path in enumerate(document_files, 1) if idx >= start_file_idx]
+
+        # Files not finished yet - the lowest one is where a resumed run restarts
+        pending_files = {idx for idx, _ in jobs}
+
+        # Documents are converted in this process (no file timeout, which
+        # needs worker processes) - load the models while the
+        # files are being hashed instead of on the first conversion. Only PDFs
+        # use these models, and converter groups run in order of first
+        # appearance, so the first PDF's converter is the first one needed.
+        prewarm_thread = None
+        first_pdf = next((doc_path for _, doc_path in jobs if doc_path.suffix.lower() == '.pdf'), None)
+        if first_pdf is not None and not file_timeout and _resolve_num_workers(num_workers, detected_device, len(jobs)) <= 1:
+            prewarm_thread = threading.Thread(
+                target=_prewarm_converter, args=(pipeline_options_dict, first_pdf, detected_device), daemon=True
+            )
+            prewarm_thread.start()
+
+        # Hash every file up front (IO-bound, so threads) and convert identical
+        # copies only once - the other copies reuse the first one's chunks
+        fingerprints = {}
+        duplicates = {}  # idx of the converted copy -> [(idx, doc_path), ...] of the others
+        if len(jobs) > 1:
+            fp_options = _fingerprint_options(pipeline_options_dict, chunker_kwargs, lean_metadata)
+
+            def fingerprint_job(job):
+                try:
+                    return _doc_fingerprint(job[1], fp_options)
+                except OSError:
+                    return None
+
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as hasher:
+                job_fingerprints = list(hasher.map(fingerprint_job, jobs))
+
+            # A copy whose parts were partly saved by an earlier session only has
+            # its remaining parts converted now, so its chunks can't be replicated
+            # to the other copies - those stay files of their own
+            saved_parts = set(completed_chunk_paths)
+
+            def has_saved_parts(doc_path):
+                return any(p == str(doc_path) or is_split_part(p, doc_path) for p in saved_parts)
+
+            first_idx = {}
+            unique_jobs = []
+            for (idx, doc_path), fp in zip(jobs, job_fingerprints):
+                if fp is not None and fp in first_idx:
+                    duplicates.setdefault(first_idx[fp], []).append((idx, doc_path))
+                    continue
+                if fp is not None:
+                    fingerprints[idx] = fp
+                    if not has_saved_parts(doc_path):
+                        first_idx[fp] = idx
+                unique_jobs.append((idx, doc_path))
+
+            if duplicates:
+                _emitter.emit({
+                    "info": f"Found {sum(map(len, duplicates.values()))} duplicate file(s) - each is converted once",
+                    "files_to_convert": len(unique_jobs)
+                })
+            jobs = unique_jobs
+
+        # Group files that need the same converter (file type + triage outcome),
+        # so one set of models stays hot for a run of files instead of the
+        # pipelines alternating per file. Cached files go first (no models at
+        # all); groups keep the order in which they first appear.
+        profile_order = {}
+
+        def job_profile(job):
+            idx, doc_path = job
+            fp = fingerprints.get(idx)
+            if fp is not None and (CACHE_DIR / f"{fp}.json").exists():
+                return -1
+            if doc_path.suffix.lower() != '.pdf':
+                key = "simple"
+            else:
+                file_options, _ = triage_file_options(doc_path, pipeline_options_dict)
+                key = tuple(sorted(file_options.items()))
+            return profile_order.setdefault(key, len(profile_order))
 
-                        pdf_chunk_results.append({
-                            "text": chunk_text,
-                            "metadata": metadata,
-                            "tokens": len(chunk_text.split())  # Rough estimate
-                        })
+        jobs.sort(key=job_profile)
 
-                    # SAVE INCREMENTALLY after each PDF chunk
-                    # This prevents data loss if process crashes
-                    is_first = (idx == 1 and chunk_idx == 1 and len(completed_chunk_paths) == 0)
-                    save_success = append_chunks_to_file(output_file, pdf_chunk_results, is_first_write=is_first)
-
-                    if save_success:
-                        all_chunks.extend(pdf_chunk_results)
-
-                        # Mark this chunk as completed
-                        completed_chunk_paths.append(chunk_path)
-
-                        # Save progress file for resume
-                        save_progress(output_file, completed_chunk_paths, idx, total_files, config)
-
-                        saved_progress = {
-                            "type": "progress",
-                            "current": idx,
-                            "total": total_files,
-                            "file": doc_path.name,
-                            "status": "saved",
-                            "current_chunk": chunk_idx,
-                            "total_chunks": total_chunks,
-                            "chunks_from_this_part": len(pdf_chunk_results),
-                            "total_chunks_so_far": len(all_chunks),
-                            "completed_parts": len(completed_chunk_paths)
-                        }
-                        print(json.dumps(saved_progress), file=sys.stderr, flush=True)
-                        sys.stderr.flush()
+        # Chunks of files that have duplicates, replicated once the file is done
+        duplicate_chunks = {idx: [] for idx in duplicates}
 
-                # Mark file as processed after all chunks done
-                processed_files.append(doc_path.name)
-                
-                # Send completion update for this file
-                progress = {
-                    "type": "progress",
-                    "current": idx,
-                    "total": total_files,
-                    "file": doc_path.name,
-                    "status": "completed",
-                    "total_chunks_so_far": len(all_chunks)
-                }
-                print(json.dumps(progress), file=sys.stderr, flush=True)
-                sys.stderr.flush()
+        def stopped_result():
+            return {
+                "success": False,
+                "error": "Stopped by user",
+                "resumable": True,
+                "completed_parts": len(completed_chunk_paths)
+            }
 
-            except Exception as e:
+        def save_part(idx, doc_path, chunk_path, chunk_idx, total_chunks, pdf_chunk_results):
+            nonlocal total_chunks_count
+
+            # SAVE INCREMENTALLY after each PDF chunk - parts are batched in the
+            # sink and committed together, so a crash loses at most one batch
+            sink.append(pdf_chunk_results)
+
+            if idx in duplicate_chunks:
+                duplicate_chunks[idx].extend(pdf_chunk_results)
+
+            total_chunks_count += len(pdf_chunk_results)
+
+            # Mark this chunk as completed (recorded in the progress file on commit)
+            completed_chunk_paths.append(chunk_path)
+            uncommitted_parts.append((chunk_path, len(pdf_chunk_results)))
+
+            saved_progress = {
+                "type": "progress",
+                "current": idx,
+                "total": total_files,
+                "file": doc_path.name,
+                "status": "saved",
+                "current_chunk": chunk_idx,
+                "total_chunks": total_chunks,
+                "chunks_from_this_part": len(pdf_chunk_results),
+                "total_chunks_so_far": total_chunks_count,
+                "completed_parts": len(completed_chunk_paths)
+            }
+            _emitter.emit(saved_progress)
+
+            if sink.should_commit():
+                commit_parts()
+
+        def finish_file(idx, doc_path, chunks_list, error):
+            for part in chunks_list:
+                save_part(idx, doc_path, *part)
+            pending_files.discard(idx)
+
+            for dup_idx, dup_path in duplicates.get(idx, ()):
+                dup_chunks = None
+                if error is None and str(dup_path) not in completed_chunk_paths:
+                    dup_chunks = [
+                        {**chunk, "metadata": {**chunk["metadata"], "source": dup_path.name, "duplicate_of": doc_path.name}}
+                        for chunk in map(_chunk_dict, duplicate_chunks[idx])
+                    ]
+                    if dup_chunks:
+                        save_part(dup_idx, dup_path, str(dup_path), 1, 1, dup_chunks)
+                finish_file(dup_idx, dup_path, [], error)
+            duplicate_chunks.pop(idx, None)
+
+            if error is not None:
                 # Send error update
                 progress = {
                     "type": "progress",
@@ -787,19 +2252,227 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
                     "total": total_files,
                     "file": doc_path.name,
                     "status": "error",
-                    "error": str(e)
+                    "error": error
                 }
-                print(json.dumps(progress), file=sys.stderr, flush=True)
-                # Continue with other files
-                continue
+                _emitter.emit(progress, force=True)
+                return
+
+            # Mark file as processed after all chunks done
+            processed_files.append(doc_path.name)
+
+            # Send completion update for this file
+            progress = {
+                "type": "progress",
+                "current": idx,
+                "total": total_files,
+                "file": doc_path.name,
+                "status": "completed",
+                "total_chunks_so_far": total_chunks_count
+            }
+            _emitter.emit(progress, force=True)
+
+        workers = _resolve_num_workers(num_workers, detected_device, len(jobs))
+        if workers != num_workers:
+            _emitter.emit({
+                "info": f"Converting with {workers} worker(s)",
+                "requested_workers": num_workers,
+                "device": detected_device
+            })
+
+        if prewarm_thread is not None:
+            prewarm_thread.join()
+
+        if workers <= 1 and not file_timeout:
+            # Process each document in this process
+            for idx, doc_path in jobs:
+                # Check for stop signal
+                if STOP_EVENT.is_set():
+                    _emitter.emit({
+                        "info": "Processing stopped by user - progress saved",
+                        "completed_parts": len(completed_chunk_paths),
+                        "can_resume": True
+                    })
+                    return stopped_result()
+
+                chunks_list, _, error = _process_one_file(
+                    doc_path, idx, total_files, pipeline_options_dict, chunker_kwargs,
+                    completed_chunk_paths=frozenset(completed_chunk_paths),
+                    device_type=detected_device,
+                    lean_metadata=lean_metadata,
+                    on_part_done=functools.partial(save_part, idx, doc_path),
+                    fingerprint=fingerprints.get(idx)
+                )
+
+                # Stopped between two parts of this file
+                if STOP_EVENT.is_set():
+                    commit_parts()
+                    save_state()
+                    _emitter.emit({
+                        "info": "Processing stopped - progress saved",
+                        "completed_parts": len(completed_chunk_paths)
+                    })
+                    return stopped_result()
+
+                # Continue with other files even if this one failed
+                finish_file(idx, doc_path, chunks_list, error)
+        else:
+            # Convert documents in parallel - each worker returns its chunks and
+            # this process stays the only writer of the output and progress files.
+            # Workers are spawned rather than forked so none inherits the parent's
+            # torch/OpenMP thread state, and load the tokenizer as they start.
+            # Their progress lines come back over a SimpleQueue per executor; it
+            # writes synchronously, so a worker's lines are readable before its
+            # result is, and draining before finish_file keeps them in order.
+            #
+            # With a file timeout, a Docling conversion can't be interrupted, so
+            # a file that overruns has to be killed with its process. Each worker
+            # is then a one-process executor of its own ("slot"), which can be
+            # terminated and replaced without breaking the others; serial runs
+            # get one slot. Files are handed to idle slots one at a time and the
+            # timeout counts from that hand-off, including a fresh slot's start-up.
+            mp_context = multiprocessing.get_context("spawn")
+            timed = file_timeout > 0
+            if timed and detected_device == 'mps' and workers > 1:
+                # A killed worker could leave the shared GPU semaphore held, and
+                # MPS conversions are serialized by it anyway
+                workers = 1
+                _emitter.emit({"info": "Converting with 1 worker - file timeouts on MPS use a single GPU slot"})
+            gpu_slot = mp_context.BoundedSemaphore(1) if detected_device == 'mps' and not timed else None
+            executors = {}  # ProcessPoolExecutor -> its progress SimpleQueue
+
+            def new_executor(max_workers):
+                progress_queue = mp_context.SimpleQueue()
+                executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=mp_context,
+                    initializer=_init_pool_worker,
+                    initargs=(chunker_kwargs["tokenizer"], progress_queue, gpu_slot)
+                )
+                executors[executor] = progress_queue
+                return executor
+
+            def drain_progress(only=None):
+                for executor, progress_queue in executors.items():
+                    if only is None or executor is only:
+                        while not progress_queue.empty():
+                            _emitter.forward(progress_queue.get())
+
+            def kill_executor(executor):
+                # Keep what the worker reported so far, then kill it; a worker
+                # killed mid-write can leave a partial line, so its queue isn't
+                # read after that
+                drain_progress(only=executor)
+                del executors[executor]
+                _terminate_pool(executor)
+
+            # Workers pick up files in submission order, so after the cache hits
+            # hand out the largest files first: a big PDF that starts last
+            # leaves every other worker idle while it finishes. Files keep
+            # their original idx, which resume bookkeeping depends on.
+            def job_size(job):
+                try:
+                    size = job[1].stat().st_size
+                except OSError:
+                    size = 0
+                return (job_profile(job) == -1, size)
+
+            jobs.sort(key=job_size, reverse=True)
+
+            futures = {}  # future -> (idx, doc_path, executor, submitted at)
+
+            def submit(executor, idx, doc_path):
+                future = executor.submit(
+                    _process_one_file, str(doc_path), idx, total_files,
+                    pipeline_options_dict, chunker_kwargs,
+                    frozenset(completed_chunk_paths), detected_device,
+                    lean_metadata=lean_metadata,
+                    fingerprint=fingerprints.get(idx)
+                )
+                futures[future] = (idx, doc_path, executor, time.monotonic())
+
+            queued_jobs = jobs[::-1]  # Popped from the end, largest first
+            idle_slots = []
+            pool_error = None
+            try:
+                if timed:
+                    idle_slots = [new_executor(1) for _ in range(workers)]
+                else:
+                    executor = new_executor(workers)
+                    while queued_jobs:
+                        submit(executor, *queued_jobs.pop())
+
+                # Wait in short slices so a stop request (or a timeout) is handled
+                # right away instead of after the next (possibly minutes-long) document
+                while futures or queued_jobs:
+                    while idle_slots and queued_jobs:
+                        submit(idle_slots.pop(), *queued_jobs.pop())
+
+                    done, _ = wait(futures, timeout=STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    drain_progress()
+                    for future in done:
+                        idx, doc_path, executor, _ = futures.pop(future)
+                        try:
+                            chunks_list, _, error = future.result()
+                        except BrokenProcessPool as e:
+                            # A worker died (e.g. killed for memory) - not this file's
+                            # fault, so it stays pending for a resume to retry
+                            pool_error = str(e) or "A worker process terminated abruptly"
+                            continue
+                        except Exception as e:
+                            chunks_list, error = [], str(e)
+                        if timed:
+                            idle_slots.append(executor)
+
+                        finish_file(idx, doc_path, chunks_list, error)
+
+                    if pool_error is not None:
+                        commit_parts()
+                        save_state()
+                        return {
+                            "success": False,
+                            "error": f"Worker process died: {pool_error}",
+                            "resumable": True,
+                            "completed_parts": len(completed_chunk_paths)
+                        }
 
-        if not all_chunks:
+                    if timed:
+                        now = time.monotonic()
+                        for future, (idx, doc_path, executor, submitted) in list(futures.items()):
+                            if now - submitted > file_timeout:
+                                del futures[future]
+                                kill_executor(executor)
+                                idle_slots.append(new_executor(1))
+                                finish_file(idx, doc_path, [], f"timeout - conversion took longer than {file_timeout:g}s")
+
+                    if STOP_EVENT.is_set():
+                        commit_parts()
+                        save_state()
+                        _emitter.emit({
+                            "info": "Processing stopped - progress saved",
+                            "completed_parts": len(completed_chunk_paths)
+                        })
+                        return stopped_result()
+            finally:
+                for executor in list(executors):
+                    if STOP_EVENT.is_set() or pool_error is not None:
+                        kill_executor(executor)
+                    else:
+                        executor.shutdown(wait=True, cancel_futures=True)
+                drain_progress()
+
+        commit_parts()
+
+        if not total_chunks_count:
             return {
                 "success": False,
                 "error": "No chunks generated from documents"
             }
 
-        # All chunks are already saved incrementally!
+        # All chunks are already saved incrementally - assemble the final JSON
+        sink.close()
+        progress_log.close()
+        finalize_output(output_file, total_chunks_count, config)
+
         # Clear progress file since we completed successfully
         clear_progress(output_file)
 
@@ -810,15 +2483,14 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
             "total": total_files,
             "file": "All files processed",
             "status": "completed",
-            "total_chunks": len(all_chunks)
+            "total_chunks": total_chunks_count
         }
-        print(json.dumps(finalizing_progress), file=sys.stderr, flush=True)
-        sys.stderr.flush()
+        _emitter.emit(finalizing_progress, force=True)
 
         # File is already saved incrementally!
         return {
             "success": True,
-            "chunks_count": len(all_chunks),
+            "chunks_count": total_chunks_count,
             "files_processed": len(processed_files),
             "output_file": output_file
         }
@@ -828,13 +2500,159 @@ def chunk_documents(input_dir, output_file, max_tokens=512, merge_peers=True, en
             "success": False,
             "error": str(e)
         }
+    finally:
+        if commit_parts is not None:
+            commit_parts()  # Record whatever was appended before an error, so a resume skips it
+        if sink is not None:
+            sink.close()
+        if progress_log is not None:
+            progress_log.close()
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+
+
+@dataclasses.dataclass(frozen=True, **({"slots": True} if sys.version_info >= (3, 10) else {}))
+class ChunkingConfig:
+    """
+    Validated chunk_documents() settings, as given by --config or a --daemon request
+
+    Keys are chunk_documents() argument names; anything omitted keeps its
+    default, unknown keys and values of the wrong type are rejected.
+    """
+    input_dir: str
+    output_file: str
+    max_tokens: int = 512
+    merge_peers: bool = True
+    enable_formula: bool = True
+    enable_picture_classification: bool = False
+    enable_picture_description: bool = False
+    enable_code_enrichment: bool = False
+    enable_ocr: bool = True
+    enable_table_structure: bool = True
+    picture_description_max_tokens: int = 100
+    resume: bool = False
+    vision_batch_size: int = 4
+    processing_batch_size: int = 4
+    num_workers: int = 1
+    lean_metadata: bool = True
+    doc_batch_size: int = 8
+    page_batch_size: int = 16
+    enable_vlm_quantization: bool = False
+    enable_torch_compile: bool = False
+    enable_mixed_precision: bool = True
+    save_every_n_chunks: int = COMMIT_MAX_CHUNKS
+    save_every_secs: float = COMMIT_MAX_SECS
+    file_timeout: float = 0
+
+    def __post_init__(self):
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if field.type is float and type(value) is int:
+                continue  # JSON has no separate float literal for whole numbers
+            if type(value) is not field.type:
+                raise TypeError(f"{field.name} must be {field.type.__name__}, got {value!r}")
+
+    @classmethod
+    def from_json(cls, value):
+        """Build from an inline JSON object or the path of a JSON file"""
+        if value.lstrip().startswith("{"):
+            data = _loads(value)
+        else:
+            with open(value, 'rb') as f:
+                data = _loads(f.read())
+        if not isinstance(data, dict):
+            raise TypeError("config must be a JSON object")
+        return cls(**data)
+
+    def as_kwargs(self):
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+
+def run_daemon():
+    """
+    Serve chunking requests from stdin until it is closed
+
+    Each input line is a JSON object of chunk_documents() keyword arguments
+    (plus an optional "id" that is echoed back); each result is written to
+    stdout as one JSON line. Converters, chunkers and tokenizers stay loaded
+    between requests, so only the first request pays the model warm-up cost.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id = None
+        try:
+            request = _loads(line)
+            request_id = request.pop("id", None)
+            config = ChunkingConfig(**request)
+            STOP_EVENT.clear()
+            response = chunk_documents(**config.as_kwargs())
+        except (ValueError, TypeError, AttributeError) as e:
+            response = {"success": False, "error": f"Invalid request: {str(e)}"}
+        except Exception as e:
+            # One failed request (e.g. an OSError) mustn't take the daemon down
+            response = {"success": False, "error": str(e)}
+
+        if request_id is not None:
+            response["id"] = request_id
+        _emitter.flush()
+        sys.stdout.write(_dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+def _pop_option(argv, name, default, cast=int):
+    """Remove `name value` from argv and return the cast value (or default if absent)"""
+    if name not in argv:
+        return default
+    pos = argv.index(name)
+    value = argv[pos + 1]
+    del argv[pos:pos + 2]
+    return cast(value)
+
+
+def _pop_flag(argv, name):
+    """Remove a boolean `name` flag from argv and return whether it was present"""
+    if name not in argv:
+        return False
+    argv.remove(name)
+    return True
 
 
 def main():
+    if "--daemon" in sys.argv[1:]:
+        run_daemon()
+        return
+
+    # All settings as one JSON object (inline or a file path)
+    config_arg = _pop_option(sys.argv, "--config", None, cast=str)
+    if config_arg is not None:
+        try:
+            config = ChunkingConfig.from_json(config_arg)
+        except (OSError, ValueError, TypeError) as e:
+            print(_dumps({"success": False, "error": f"Invalid config: {str(e)}"}))
+            sys.exit(1)
+        result = chunk_documents(**config.as_kwargs())
+        _emitter.flush()
+        print(_dumps(result))
+        return
+
+    # Optional flags (may appear anywhere, positional arguments keep their order)
+    doc_batch_size = _pop_option(sys.argv, "--doc-batch-size", 8)
+    page_batch_size = _pop_option(sys.argv, "--page-batch-size", 16)
+    enable_vlm_quantization = _pop_flag(sys.argv, "--vlm-int8")
+    enable_torch_compile = _pop_flag(sys.argv, "--torch-compile")
+    enable_mixed_precision = not _pop_flag(sys.argv, "--fp32")
+    emit_doc_items = _pop_flag(sys.argv, "--emit-doc-items")  # Full str() dumps instead of references
+    save_every_n_chunks = _pop_option(sys.argv, "--save-every-chunks", COMMIT_MAX_CHUNKS)
+    save_every_secs = _pop_option(sys.argv, "--save-every-secs", COMMIT_MAX_SECS, cast=float)
+    file_timeout = _pop_option(sys.argv, "--file-timeout", 0, cast=float)
+
     if len(sys.argv) < 3:
-        print(json.dumps({
+        print(_dumps({
             "success": False,
-            "error": "Usage: docling_chunker.py <input_dir> <output_file> [max_tokens] [merge_peers] [enable_formula] [enable_picture_classification] [enable_picture_description] [enable_code_enrichment] [enable_ocr] [enable_table_structure] [picture_description_max_tokens]"
+            "error": "Usage: docling_chunker.py --daemon | --config <json|file> | [--doc-batch-size N] [--page-batch-size N] [--vlm-int8] [--torch-compile] [--fp32] [--emit-doc-items] [--save-every-chunks N] [--save-every-secs S] [--file-timeout S] <input_dir> <output_file> [max_tokens] [merge_peers] [enable_formula] [enable_picture_classification] [enable_picture_description] [enable_code_enrichment] [enable_ocr] [enable_table_structure] [picture_description_max_tokens] [resume] [vision_batch_size] [processing_batch_size] [num_workers]"
         }))
         sys.exit(1)
 
@@ -852,9 +2670,15 @@ def main():
     resume = sys.argv[12].lower() == 'true' if len(sys.argv) > 12 else False  # Resume from saved progress
     vision_batch_size = int(sys.argv[13]) if len(sys.argv) > 13 else 4  # Default 4 for vision model
     processing_batch_size = int(sys.argv[14]) if len(sys.argv) > 14 else 4  # Default 4 for OCR/layout/table
-
-    result = chunk_documents(input_dir, output_file, max_tokens, merge_peers, enable_formula, enable_picture_classification, enable_picture_description, enable_code_enrichment, enable_ocr, enable_table_structure, picture_description_max_tokens, resume, vision_batch_size, processing_batch_size)
-    print(json.dumps(result))
+    num_workers = int(sys.argv[15]) if len(sys.argv) > 15 else 1  # Default 1 (documents processed one at a time), 0 = auto
+
+    result = chunk_documents(input_dir, output_file, max_tokens, merge_peers, enable_formula, enable_picture_classification, enable_picture_description, enable_code_enrichment, enable_ocr, enable_table_structure, picture_description_max_tokens, resume, vision_batch_size, processing_batch_size, num_workers, lean_metadata=not emit_doc_items, doc_batch_size=doc_batch_size, page_batch_size=page_batch_size,
+                            enable_vlm_quantization=enable_vlm_quantization, enable_torch_compile=enable_torch_compile,
+                            enable_mixed_precision=enable_mixed_precision,
+                            save_every_n_chunks=save_every_n_chunks, save_every_secs=save_every_secs,
+                            file_timeout=file_timeout)
+    _emitter.flush()
+    print(_dumps(result))
 
 
 if __name__ == "__main__":
@@ -184,7 +184,7 @@ router.get('/check-resumable/:projectId', async (req, res) => {
 
     // Check for existing progress file
     const outputDir = ProjectService.getChunkedDataPath(projectId);
-    const outputFile = path.join(outputDir, 'chunks.json');
+    const outputFile = path.join(outputDir, 'chunks.ndjson');
     const progressFile = path.join(outputDir, `.progress_chunks.json`);
 
     try {
@@ -196,7 +196,7 @@ router.get('/check-resumable/:projectId', async (req, res) => {
       res.json({
         success: true,
         resumable: ageHours < 168, // 7 days
-        completedParts: progressData.completed_chunks ? progressData.completed_chunks.length : 0,
+        completedParts: progressData.completed_parts ?? (progressData.completed_chunks ? progressData.completed_chunks.length : 0),
         ageHours: Math.round(ageHours),
         config: progressData.config
       });
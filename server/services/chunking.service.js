@@ -2,6 +2,8 @@ import { spawn } from 'child_process';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import fs from 'fs/promises';
+import { createReadStream } from 'fs';
+import readline from 'readline';
 import { ProjectService } from './project.service.js';
 
 const __filename = fileURLToPath(import.meta.url);
@@ -63,7 +65,9 @@ export class ChunkingService {
   static async chunkWithDocling(projectId, config, jobId = null, resume = false) {
     const inputDir = ProjectService.getRawFilesPath(projectId);
     const outputDir = ProjectService.getChunkedDataPath(projectId);
-    const outputFile = path.join(outputDir, 'chunks.json');
+    // JSON Lines output: the Python side moves its chunk file into place
+    // instead of assembling one big JSON document at the end
+    const outputFile = path.join(outputDir, 'chunks.ndjson');
 
     // Ensure output directory exists
     await fs.mkdir(outputDir, { recursive: true });
@@ -84,6 +88,14 @@ export class ChunkingService {
       // Batch size options (performance tuning)
       const visionBatchSize = config.visionBatchSize || 4; // Default 4 for vision model
       const processingBatchSize = config.processingBatchSize || 4; // Default 4 for OCR/layout/table
+      const numWorkers = config.numWorkers ?? 1; // Documents converted in parallel (each worker loads its own models, 0 = auto)
+      const enableVlmQuantization = config.enableVlmQuantization || false; // int8 picture description model (CPU only)
+      const enableTorchCompile = config.enableTorchCompile || false; // torch.compile the layout/table/VLM models
+      const mixedPrecision = config.mixedPrecision !== undefined ? config.mixedPrecision : true; // FP16/BF16 autocast on GPUs
+      const emitDocItems = config.emitDocItems || false; // Full doc item dumps in chunk metadata (default: references only)
+      const saveEveryChunks = config.saveEveryChunks; // Commit chunks/progress after this many chunks (Python default 64)
+      const saveEverySecs = config.saveEverySecs; // ...or after this many seconds (Python default 5)
+      const fileTimeout = config.fileTimeout || 0; // Skip a file still converting after this many seconds (0 = no limit)
 
       console.log('[Chunking] Enrichment settings:', {
         formulas: enableFormula,
@@ -95,26 +107,48 @@ export class ChunkingService {
         tableStructure: enableTableStructure,
         visionBatchSize: visionBatchSize,
         processingBatchSize: processingBatchSize,
+        numWorkers: numWorkers,
+        vlmQuantization: enableVlmQuantization,
+        torchCompile: enableTorchCompile,
+        mixedPrecision: mixedPrecision,
+        emitDocItems: emitDocItems,
+        saveEveryChunks: saveEveryChunks,
+        saveEverySecs: saveEverySecs,
+        fileTimeout: fileTimeout,
         resume: resume
       });
 
+      // All settings go to Python as one JSON object (keys are chunk_documents() arguments)
+      const pythonConfig = {
+        input_dir: inputDir,
+        output_file: outputFile,
+        max_tokens: maxTokens,
+        merge_peers: mergePeers,
+        enable_formula: enableFormula,
+        enable_picture_classification: enablePictureClassification,
+        enable_picture_description: enablePictureDescription,
+        enable_code_enrichment: enableCodeEnrichment,
+        enable_ocr: enableOcr,
+        enable_table_structure: enableTableStructure,
+        picture_description_max_tokens: pictureDescriptionMaxTokens,
+        resume: resume,
+        vision_batch_size: visionBatchSize, // Vision model batch size
+        processing_batch_size: processingBatchSize, // OCR/layout/table batch size
+        num_workers: numWorkers, // Parallel document workers
+        enable_vlm_quantization: enableVlmQuantization,
+        enable_torch_compile: enableTorchCompile,
+        enable_mixed_precision: mixedPrecision,
+        lean_metadata: !emitDocItems,
+        file_timeout: fileTimeout,
+        ...(saveEveryChunks !== undefined ? { save_every_n_chunks: saveEveryChunks } : {}),
+        ...(saveEverySecs !== undefined ? { save_every_secs: saveEverySecs } : {})
+      };
+
       const pythonProcess = spawn('python3', [
         '-u',  // Unbuffered output
         PYTHON_SCRIPT,
-        inputDir,
-        outputFile,
-        maxTokens.toString(),
-        mergePeers.toString(),
-        enableFormula.toString(),
-        enablePictureClassification.toString(),
-        enablePictureDescription.toString(),
-        enableCodeEnrichment.toString(),
-        enableOcr.toString(),
-        enableTableStructure.toString(),
-        pictureDescriptionMaxTokens.toString(),
-        resume.toString(), // Resume parameter
-        visionBatchSize.toString(), // Vision model batch size
-        processingBatchSize.toString() // OCR/layout/table batch size
+        '--config',
+        JSON.stringify(pythonConfig)
       ], {
         env: { ...process.env, PYTHONUNBUFFERED: '1' },
         detached: true // Create process group so we can kill all children at once
@@ -205,13 +239,17 @@ export class ChunkingService {
           }
 
           // Load the generated chunks
-          const chunksData = JSON.parse(await fs.readFile(outputFile, 'utf-8'));
+          const chunksData = await this.readChunksFile(outputFile);
 
           // Save to project
           await ProjectService.saveProjectChunks(projectId, chunksData.chunks, 'docling-hybrid');
 
           console.log(`Chunking complete: ${chunksData.chunks.length} chunks generated`);
 
+          // The project copy above is what the rest of the app reads
+          await fs.rm(outputFile, { force: true });
+          await fs.rm(`${outputFile}.meta.json`, { force: true });
+
           resolve({
             success: true,
             chunks: chunksData,
@@ -227,6 +265,23 @@ export class ChunkingService {
     });
   }
 
+  static async readChunksFile(outputFile) {
+    // Header (method, config, total_chunks) is kept next to the chunk lines
+    const chunksData = JSON.parse(await fs.readFile(`${outputFile}.meta.json`, 'utf-8'));
+    chunksData.chunks = [];
+
+    const lines = readline.createInterface({
+      input: createReadStream(outputFile, { encoding: 'utf-8' }),
+      crlfDelay: Infinity,
+    });
+    for await (const line of lines) {
+      if (line) {
+        chunksData.chunks.push(JSON.parse(line));
+      }
+    }
+    return chunksData;
+  }
+
   static async uploadPreChunked(projectId, chunksData) {
     try {
       // Validate chunks format
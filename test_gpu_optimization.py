@@ -23,25 +23,31 @@ else:
 print("\n2. Testing GPU performance:")
 print("   Running matrix multiplication benchmark...")
 
-# CPU test
+# CPU test (one warm-up call so allocation/threading setup isn't timed)
 device_cpu = torch.device('cpu')
 x_cpu = torch.randn(1000, 1000, device=device_cpu)
 y_cpu = torch.randn(1000, 1000, device=device_cpu)
+torch.matmul(x_cpu, y_cpu)
 
-start = time.time()
+start = time.perf_counter()
 for _ in range(10):
     result_cpu = torch.matmul(x_cpu, y_cpu)
-cpu_time = time.time() - start
+cpu_time = time.perf_counter() - start
 
-# GPU test
+# GPU test - MPS kernels run asynchronously, so warm up first and synchronize
+# around the timed loop to measure the compute rather than the dispatch
 device_mps = torch.device('mps')
 x_mps = torch.randn(1000, 1000, device=device_mps)
 y_mps = torch.randn(1000, 1000, device=device_mps)
+for _ in range(3):
+    torch.matmul(x_mps, y_mps)
+torch.mps.synchronize()
 
-start = time.time()
+start = time.perf_counter()
 for _ in range(10):
     result_mps = torch.matmul(x_mps, y_mps)
-mps_time = time.time() - start
+torch.mps.synchronize()
+mps_time = time.perf_counter() - start
 
 print(f"   CPU time: {cpu_time:.3f}s")
 print(f"   GPU time: {mps_time:.3f}s")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Check that a pool-mode chunking run exits promptly when it is stopped
+
+Usage: python test_stop_exit.py <input_dir> [stop_after_secs] [num_workers]
+
+Pick an input_dir whose documents take longer than stop_after_secs to
+convert, so conversions are still running when SIGTERM is sent.
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+PYTHON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server/python/docling_chunker.py")
+MAX_EXIT_SECS = 5.0
+
+if len(sys.argv) < 2:
+    print("Usage: python test_stop_exit.py <input_dir> [stop_after_secs] [num_workers]")
+    sys.exit(1)
+
+input_dir = sys.argv[1]
+stop_after = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+num_workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+print("=" * 60)
+print("Stop / exit test")
+print("=" * 60)
+
+with tempfile.TemporaryDirectory() as output_dir:
+    config = {
+        "input_dir": input_dir,
+        "output_file": os.path.join(output_dir, "chunks.json"),
+        "num_workers": num_workers
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-u", PYTHON_SCRIPT, "--config", json.dumps(config)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+
+    print(f"\n1. Letting {num_workers} worker(s) convert for {stop_after:g}s...")
+    time.sleep(stop_after)
+    if process.poll() is not None:
+        print("   ✗ Run finished before it was stopped - use larger documents or a shorter delay")
+        sys.exit(1)
+
+    print("\n2. Sending SIGTERM:")
+    start = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        output, _ = process.communicate(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        print("   ✗ Process still running 60s after SIGTERM")
+        sys.exit(1)
+    exit_secs = time.perf_counter() - start
+    print(f"   Process exited after {exit_secs:.2f}s (code {process.returncode})")
+
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    print(f"   Result: {result}")
+
+print("\n3. Checking:")
+ok = True
+if result.get("resumable"):
+    print("   ✓ Run reported a resumable stop")
+else:
+    print("   ✗ Run did not report a resumable stop")
+    ok = False
+if exit_secs <= MAX_EXIT_SECS:
+    print(f"   ✓ Workers were stopped within {MAX_EXIT_SECS:g}s")
+else:
+    print(f"   ✗ Exit took longer than {MAX_EXIT_SECS:g}s - in-flight conversions were not terminated")
+    ok = False
+
+sys.exit(0 if ok else 1)